@@ -0,0 +1,370 @@
+"""
+Moteur d'analyse en mémoire (pandas/NumPy) pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Quand ni les résultats Spark (MongoDB) ni les sorties HDFS ne sont
+disponibles, les analyses étaient recalculées par une agrégation MongoDB
+complète ($group/$lookup) à chaque requête. Le moteur garde les ventes
+en colonnes NumPy (codes entiers pour les produits, clients et villes,
+jour de vente en entier) et répond par des regroupements vectorisés
+(np.bincount) en quelques millisecondes.
+
+Le chargement est incrémental : seules les ventes et les clients dont
+l'_id dépasse le dernier watermark sont lus. Une diminution du nombre de
+ventes (suppression) provoque un rechargement complet ; les
+modifications de ventes existantes ne sont pas vues (comme pour
+summary.py).
+
+Sémantique identique au job Spark (mongodb_reader.py) :
+    produits : count(*), sum(quantity), avg(price) hors valeurs nulles,
+               sum(quantity * price) ; groupe null conservé
+    villes   : jointure interne ventes-clients sur customer_id = id,
+               transactions, chiffre d'affaires, clients distincts
+    clients  : count(*) et sum(quantity * price) par customer_id
+Les montants ne sont pas arrondis et les prix restent en float64 : les
+sommes sont celles de Spark (DoubleType), pas des valeurs approchées.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pymongo
+
+from partitions import sale_date
+
+SALE_FIELDS = ['_id', 'product', 'quantity', 'price', 'date', 'customer_id']
+CUSTOMER_FIELDS = ['_id', 'id', 'city']
+
+
+class Dictionary:
+    """Codes entiers stables pour une valeur catégorielle (None compris)"""
+
+    def __init__(self):
+        self._codes = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        """Codes d'un lot : factorisation pandas, puis une recherche par valeur distincte"""
+        local, uniques = pd.factorize(np.asarray(values, dtype=object))
+        mapping = np.fromiter((self.code(v) for v in uniques), dtype=np.int32, count=len(uniques))
+        codes = np.empty(len(local), dtype=np.int32)
+        present = local >= 0
+        codes[present] = mapping[local[present]]
+        if not present.all():
+            codes[~present] = self.code(None)
+        return codes
+
+
+class Columns:
+    """Colonnes NumPy extensibles ; les lecteurs ne voient que les size premières lignes
+
+    La capacité double à chaque extension, sans dépasser max_capacity : à la
+    limite, aucune ligne n'est allouée pour rien.
+    """
+
+    def __init__(self, dtypes, capacity=1024, max_capacity=None):
+        self.dtypes = dtypes
+        self.max_capacity = max_capacity
+        self.arrays = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def append(self, batch):
+        count = len(next(iter(batch.values())))
+        needed = self.size + count
+        capacity = len(next(iter(self.arrays.values())))
+        if needed > capacity:
+            capacity = capacity * 2
+            if self.max_capacity is not None:
+                capacity = min(capacity, self.max_capacity)
+            capacity = max(needed, capacity)
+            # Nouveaux tableaux : les instantanés en cours gardent les anciens
+            grown = {}
+            for name, array in self.arrays.items():
+                grown[name] = np.empty(capacity, dtype=self.dtypes[name])
+                grown[name][:self.size] = array[:self.size]
+            self.arrays = grown
+        for name, values in batch.items():
+            self.arrays[name][self.size:needed] = values
+        return needed
+
+
+def _day_numbers(values, cache):
+    """Jour de vente (ordinal) de chaque valeur, -1 si illisible"""
+    local, uniques = pd.factorize(np.asarray(values, dtype=object))
+    mapping = np.empty(len(uniques), dtype=np.int32)
+    for i, value in enumerate(uniques):
+        day = cache.get(value)
+        if day is None:
+            parsed = sale_date(value)
+            day = cache[value] = parsed.toordinal() if parsed else -1
+        mapping[i] = day
+    days = np.full(len(local), -1, dtype=np.int32)
+    present = local >= 0
+    days[present] = mapping[local[present]]
+    return days
+
+
+def _numbers(values, dtype):
+    """Valeurs numériques d'un lot, NaN si absentes ou invalides"""
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    return numbers.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+class AnalyticsEngine:
+    """Ventes et clients en colonnes, agrégations vectorisées"""
+
+    def __init__(self, get_db, interval=30, max_rows=5_000_000, batch_size=50_000):
+        self.get_db = get_db
+        self.interval = interval
+        # Au-delà, le moteur se désactive (mémoire) et MongoDB agrège :
+        # 32 octets par vente, dans chaque worker gunicorn
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        self.products = Dictionary()
+        self.customers = Dictionary()
+        self.cities = Dictionary()
+        self.sales = Columns({
+            'product': np.int32, 'customer': np.int32, 'day': np.int32,
+            'quantity': np.float32, 'price': np.float64, 'amount': np.float64
+        }, max_capacity=self.max_rows)
+        # Ville de chaque code client (-1 : client inconnu, exclu de la jointure)
+        self._city_of = np.empty(0, dtype=np.int32)
+        self._day_cache = {}
+        self._sales_watermark = None
+        self._customers_watermark = None
+        self.ready = False
+        # Change à chaque ajout : sert de clé au cache des résultats
+        self.version = 0
+        self.loaded_at = None
+
+    # --- Chargement -----------------------------------------------------
+
+    def _batches(self, collection, watermark, fields):
+        query = {'_id': {'$gt': watermark}} if watermark is not None else {}
+        cursor = collection.find(query, {field: 1 for field in fields}, batch_size=self.batch_size) \
+            .sort('_id', pymongo.ASCENDING)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _load_customers(self, db):
+        added = 0
+        for batch in self._batches(db.customers, self._customers_watermark, CUSTOMER_FIELDS):
+            frame = pd.DataFrame.from_records(batch, columns=CUSTOMER_FIELDS)
+            codes = self.customers.encode(frame['id'])
+            city_codes = self.cities.encode(frame['city'])
+            city_of = np.full(len(self.customers), -1, dtype=np.int32)
+            city_of[:len(self._city_of)] = self._city_of
+            city_of[codes] = city_codes
+            with self._lock:
+                self._city_of = city_of
+                self._customers_watermark = batch[-1]['_id']
+            added += len(batch)
+        return added
+
+    def _load_sales(self, db):
+        added = 0
+        for batch in self._batches(db.sales, self._sales_watermark, SALE_FIELDS):
+            if self.sales.size + len(batch) > self.max_rows:
+                raise MemoryError(f"plus de {self.max_rows} ventes (ANALYTICS_MAX_ROWS)")
+            frame = pd.DataFrame.from_records(batch, columns=SALE_FIELDS)
+            quantity = _numbers(frame['quantity'], np.float64)
+            price = _numbers(frame['price'], np.float64)
+            # Valeurs nulles ignorées par les sommes, comme sum() de Spark : 0 dans
+            # quantity et amount ; price garde NaN pour le nombre de prix de avg()
+            amount = np.nan_to_num(quantity * price, nan=0.0)
+            columns = {
+                'product': self.products.encode(frame['product']),
+                'customer': self.customers.encode(frame['customer_id']),
+                'day': _day_numbers(frame['date'], self._day_cache),
+                'quantity': np.nan_to_num(quantity, nan=0.0),
+                'price': price,
+                'amount': amount
+            }
+            size = self.sales.append(columns)
+            with self._lock:
+                self.sales.size = size
+                self._sales_watermark = batch[-1]['_id']
+            added += len(batch)
+        return added
+
+    def refresh(self):
+        """Intégrer les clients et ventes ajoutés depuis les derniers watermarks"""
+        if self.disabled:
+            return 0
+        db = self.get_db()
+        if self.ready and db.sales.estimated_document_count() < self.sales.size:
+            print("Ventes supprimées : rechargement complet du moteur d'analyse")
+            with self._lock:
+                self._reset()
+        started = time.perf_counter()
+        try:
+            customers = self._load_customers(db)
+            sales = self._load_sales(db)
+        except MemoryError as e:
+            print(f"Moteur d'analyse désactivé ({e}), agrégation MongoDB conservée")
+            with self._lock:
+                self._reset()
+                self.disabled = True
+            return 0
+        with self._lock:
+            if sales or customers or not self.ready:
+                self.version += 1
+            self.ready = True
+            self.loaded_at = time.time()
+        if sales or customers:
+            print(f"Moteur d'analyse: +{sales} ventes, +{customers} clients "
+                  f"en {time.perf_counter() - started:.2f} s ({self.sales.size} ventes en mémoire)")
+        return sales
+
+    # --- Requêtes -------------------------------------------------------
+
+    def _snapshot(self, period=None):
+        """Colonnes visibles (restreintes à la période) et valeurs des dictionnaires
+
+        Les listes de valeurs ne font que grandir : un code vu dans les
+        colonnes a toujours sa valeur, même si un chargement a lieu pendant
+        la requête.
+        """
+        with self._lock:
+            size = self.sales.size
+            arrays = {name: array[:size] for name, array in self.sales.arrays.items()}
+            city_of = self._city_of
+            names = self.products.values, self.customers.values, self.cities.values
+        counts = [len(values) for values in names]
+        if period:
+            start, end = period
+            mask = arrays['day'] >= 0
+            if start:
+                mask &= arrays['day'] >= start.toordinal()
+            if end:
+                mask &= arrays['day'] <= end.toordinal()
+            arrays = {name: array[mask] for name, array in arrays.items()}
+        customers = counts[1]
+        if len(city_of) < customers:
+            city_of = np.concatenate([city_of, np.full(customers - len(city_of), -1, dtype=np.int32)])
+        return arrays, city_of, names, counts
+
+    def product_analysis(self, period=None):
+        sales, _, (names, _, _), (products, _, _) = self._snapshot(period)
+        keys = sales['product']
+        total_sales = np.bincount(keys, minlength=products)
+        total_quantity = np.bincount(keys, weights=sales['quantity'], minlength=products)
+        priced = ~np.isnan(sales['price'])
+        sum_price = np.bincount(keys[priced], weights=sales['price'][priced], minlength=products)
+        price_count = np.bincount(keys[priced], minlength=products)
+        total_revenue = np.bincount(keys, weights=sales['amount'], minlength=products)
+        order = np.argsort(-total_revenue, kind='stable')
+        return [
+            {
+                'product': names[i],
+                'total_sales': int(total_sales[i]),
+                'total_quantity': int(total_quantity[i]),
+                'avg_price': float(sum_price[i] / price_count[i]) if price_count[i] else None,
+                'total_revenue': float(total_revenue[i])
+            }
+            for i in order.tolist() if total_sales[i]
+        ]
+
+    def city_analysis(self, period=None):
+        sales, city_of, (_, _, names), (_, customers, cities) = self._snapshot(period)
+        # Jointure interne : les ventes sans client connu sont exclues
+        city = city_of[sales['customer']]
+        joined = city >= 0
+        keys = city[joined]
+        total_transactions = np.bincount(keys, minlength=cities)
+        city_revenue = np.bincount(keys, weights=sales['amount'][joined], minlength=cities)
+        buyers = np.bincount(sales['customer'][joined], minlength=customers) > 0
+        unique_customers = np.bincount(city_of[buyers], minlength=cities)
+        order = np.argsort(-city_revenue, kind='stable')
+        return [
+            {
+                'city': names[i],
+                'total_transactions': int(total_transactions[i]),
+                'city_revenue': float(city_revenue[i]),
+                'unique_customers': int(unique_customers[i])
+            }
+            for i in order.tolist() if total_transactions[i]
+        ]
+
+    def customer_analysis(self, period=None, top=None):
+        """Achats par client, triés par montant ; top=K ne trie que les K premiers"""
+        sales, _, (_, names, _), (_, customers, _) = self._snapshot(period)
+        keys = sales['customer']
+        purchase_count = np.bincount(keys, minlength=customers)
+        customer_total = np.bincount(keys, weights=sales['amount'], minlength=customers)
+        candidates = np.flatnonzero(purchase_count)
+        if top is not None and top < len(candidates):
+            # Sélection partielle en O(n), tri des seuls K retenus
+            candidates = candidates[np.argpartition(-customer_total[candidates], top - 1)[:top]]
+        order = candidates[np.argsort(-customer_total[candidates], kind='stable')]
+        return [
+            {
+                'customer_id': names[i],
+                'purchase_count': int(purchase_count[i]),
+                'customer_total': float(customer_total[i])
+            }
+            for i in order.tolist()
+        ]
+
+    def watermark(self):
+        """_id de la dernière vente chargée (identique dans tous les workers à jour)"""
+        with self._lock:
+            return self._sales_watermark if self.ready else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'disabled': self.disabled,
+                'sales': self.sales.size,
+                'products': len(self.products),
+                'customers': len(self.customers),
+                'cities': len(self.cities),
+                'memory_bytes': sum(a[:self.sales.size].nbytes for a in self.sales.arrays.values()),
+                'version': self.version,
+                'loaded_at': self.loaded_at
+            }
+
+    # --- Tâche de fond --------------------------------------------------
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erreur chargement du moteur d'analyse: {e}")
+            if self.disabled or self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='analytics-engine', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,10 @@
+"""
+Point d'entrée ASGI de l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+    gunicorn -c gunicorn.conf.py asgi:app
+"""
+
+from main import create_app
+
+app = create_app()
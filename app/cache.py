@@ -0,0 +1,270 @@
+"""
+Cache des résultats d'analyse pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Cache mémoire borné (LRU) avec durée de vie (TTL) et calcul unique
+(single-flight) : si plusieurs requêtes manquent la même clé en même
+temps, une seule calcule le résultat et les autres l'attendent (threads
+avec get_or_compute, coroutines avec get_or_compute_async).
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class _InFlight:
+    """Calcul en cours pour une clé"""
+
+    def __init__(self, future=None):
+        self.event = threading.Event()
+        # Future asyncio attendue par les coroutines (calcul lancé par une coroutine)
+        self.future = future
+        self.value = None
+        self.error = None
+
+    def finish(self):
+        self.event.set()
+        if self.future is not None and not self.future.done():
+            if isinstance(self.error, asyncio.CancelledError):
+                self.future.cancel()
+            elif self.error is not None:
+                self.future.set_exception(self.error)
+            else:
+                self.future.set_result(self.value)
+
+
+class ResultCache:
+    """Cache LRU avec TTL, calcul unique par clé et invalidation explicite"""
+
+    def __init__(self, max_entries=128, ttl=60, on_access=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Appelé avec 'hit' ou 'miss' à chaque accès (métriques)
+        self.on_access = on_access
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _record(self, result):
+        if self.on_access is not None:
+            self.on_access(result)
+
+    def get(self, key):
+        """Valeur en cache (None si absente ou expirée)"""
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Retourner la valeur en cache ou la calculer une seule fois"""
+        with self._lock:
+            entry = self._get_locked(key)
+            if entry is not None:
+                self.hits += 1
+                self._record('hit')
+                return entry[0]
+            self.misses += 1
+            self._record('miss')
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            with self._lock:
+                # Une invalidation pendant le calcul retire la clé de _in_flight :
+                # le résultat (potentiellement périmé) n'est alors pas conservé
+                if self._in_flight.get(key) is flight:
+                    self._set_locked(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+            flight.finish()
+
+    async def get_or_compute_async(self, key, compute, ttl=None):
+        """Variante asyncio : compute est une fonction coroutine
+
+        Les coroutines qui manquent la même clé attendent le calcul en
+        cours sans bloquer la boucle d'événements.
+        """
+        with self._lock:
+            entry = self._get_locked(key)
+            if entry is not None:
+                self.hits += 1
+                self._record('hit')
+                return entry[0]
+            self.misses += 1
+            self._record('miss')
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                future = asyncio.get_running_loop().create_future()
+                # Exception consommée même si aucune coroutine n'attend
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                flight = _InFlight(future)
+                self._in_flight[key] = flight
+
+        if not leader:
+            if flight.future is not None:
+                return await asyncio.shield(flight.future)
+            # Calcul lancé par un thread : attente hors de la boucle
+            await asyncio.to_thread(flight.event.wait)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = await compute()
+            with self._lock:
+                if self._in_flight.get(key) is flight:
+                    self._set_locked(key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+            flight.finish()
+
+    def invalidate(self, predicate=None):
+        """Supprimer les entrées (toutes, ou celles dont la clé vérifie predicate)"""
+        with self._lock:
+            keys = [k for k in self._entries if predicate is None or predicate(k)]
+            for key in keys:
+                del self._entries[key]
+            for key in [k for k in self._in_flight if predicate is None or predicate(k)]:
+                del self._in_flight[key]
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class OutputWatcher:
+    """Surveiller les répertoires de sortie HDFS et appeler on_change à chaque nouvelle exécution
+
+    La date de modification d'un répertoire HDFS change quand un fils est
+    créé ou supprimé, ce qui est le cas à chaque écriture Spark (overwrite)
+    ou Pig (rmr + STORE).
+    """
+
+    thread_name = 'output-watcher'
+
+    def __init__(self, hdfs_client, directories, on_change, interval=15):
+        self.hdfs_client = hdfs_client
+        self.directories = directories
+        self.on_change = on_change
+        self.interval = interval
+        self._versions = {}
+        self._checked = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Comparer les dates de modification avec la vérification précédente"""
+        for directory in self.directories:
+            try:
+                version = self._version(directory)
+            except Exception as e:
+                print(f"Erreur surveillance {directory}: {e}")
+                continue
+            previous = self._versions.get(directory, version)
+            self._versions[directory] = version
+            if version != previous:
+                print(f"Nouveaux résultats détectés dans {directory}")
+                self.on_change(directory)
+        self._checked = True
+
+    def _version(self, directory):
+        status = self.hdfs_client.get_file_status(directory)
+        return status['modificationTime'] if status else None
+
+    def versions(self):
+        """Dates de modification (ms) des répertoires, None avant la première vérification"""
+        if not self._checked:
+            return None
+        return dict(self._versions)
+
+    def _run(self):
+        # Première vérification dans le thread : le démarrage du worker n'attend
+        # ni WebHDFS ni MongoDB, la version reste inconnue (None) d'ici là
+        self.check()
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class PublicationWatcher(OutputWatcher):
+    """Surveiller les publications des résultats Spark dans MongoDB
+
+    Le job Spark enregistre dans la collection `publications` une version
+    (millisecondes epoch) par collection publiée, après le renommage ou les
+    upserts : les lecteurs savent ainsi quand le contenu MongoDB change,
+    indépendamment des sorties HDFS écrites avant lui.
+    """
+
+    thread_name = 'publication-watcher'
+
+    def __init__(self, get_db, collections, on_change, interval=15):
+        super().__init__(None, collections, on_change, interval)
+        self.get_db = get_db
+
+    def _version(self, collection):
+        document = self.get_db().publications.find_one({'_id': collection}, {'version': 1})
+        return document['version'] if document else None
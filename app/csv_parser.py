@@ -0,0 +1,108 @@
+"""
+Parseur CSV en flux pour les sorties Spark/Pig
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les fichiers part-* sont décodés ligne par ligne selon un schéma typé,
+avec le module csv (gestion des guillemets de Spark). Rien n'est chargé
+en entier en mémoire : parse_rows est un générateur, RowParser décode
+les lots de lignes lus en flux depuis WebHDFS.
+"""
+
+import csv
+
+
+class Field:
+    """Colonne d'un schéma : nom de sortie, type et valeur par défaut"""
+
+    def __init__(self, name, kind, default=None):
+        self.name = name
+        self.kind = kind
+        self.default = default if default is not None else kind()
+
+    def decode(self, value):
+        value = value.strip()
+        if not value:
+            return self.default
+        if self.kind is int:
+            try:
+                return int(value)
+            except ValueError:
+                return int(float(value))
+        return self.kind(value)
+
+
+# Colonnes dans l'ordre d'écriture de Spark (en-tête) et de Pig (sans en-tête)
+PRODUCT_SCHEMA = [
+    Field('product', str),
+    Field('total_sales', int),
+    Field('total_quantity', int),
+    Field('avg_price', float),
+    Field('total_revenue', float),
+]
+
+SPARK_CITY_SCHEMA = [
+    Field('city', str),
+    Field('total_transactions', int),
+    Field('city_revenue', float),
+    Field('unique_customers', int),
+]
+
+PIG_CITY_SCHEMA = [
+    Field('city', str),
+    Field('total_transactions', int),
+    Field('city_revenue', float),
+]
+
+CUSTOMER_SCHEMA = [
+    Field('customer_id', str),
+    Field('purchase_count', int),
+    Field('customer_total', float),
+]
+
+
+def _is_header(row, schema):
+    """Une ligne d'en-tête Spark reprend exactement des noms de colonnes du schéma"""
+    names = {field.name for field in schema}
+    cells = [cell.strip().lower() for cell in row]
+    return bool(cells) and cells[0] == schema[0].name and all(cell in names for cell in cells)
+
+
+class RowParser:
+    """Décodeur incrémental de lignes CSV en dictionnaires typés
+
+    Les lignes arrivent par lots successifs (morceaux d'une réponse HTTP) :
+    l'ordre des colonnes fixé par un en-tête Spark est conservé d'un lot à
+    l'autre. Sans en-tête (Pig), l'ordre du schéma est utilisé.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.by_name = {field.name: field for field in schema}
+        self.columns = schema
+
+    def feed(self, lines):
+        """Décoder un lot de lignes (générateur)"""
+        for row in csv.reader(lines):
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            if _is_header(row, self.schema):
+                self.columns = [self.by_name[cell.strip().lower()] for cell in row]
+                continue
+            try:
+                record = {field.name: field.default for field in self.schema}
+                for field, value in zip(self.columns, row):
+                    record[field.name] = field.decode(value)
+                yield record
+            except (ValueError, TypeError) as e:
+                print(f"Erreur parsing ligne {row}: {e}")
+                continue
+
+
+def parse_rows(lines, schema):
+    """Décoder en flux des lignes CSV en dictionnaires typés
+
+    Chaque fichier part-* de Spark commence par un en-tête : il fixe l'ordre
+    des colonnes pour les lignes suivantes. Sans en-tête (Pig), l'ordre du
+    schéma est utilisé.
+    """
+    return RowParser(schema).feed(lines)
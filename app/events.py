@@ -0,0 +1,101 @@
+"""
+Diffusion d'événements en temps réel pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les tâches de fond (résumé des ventes, sondes de santé, surveillance des
+sorties HDFS, jobs) publient de petits événements ; chaque onglet ouvert
+reçoit ceux de son worker via /api/events (Server-Sent Events). Un message
+est sérialisé une seule fois quel que soit le nombre d'abonnés : le coût
+suit le rythme des changements, pas le nombre d'onglets.
+"""
+
+import asyncio
+import json
+import threading
+
+
+def format_event(event_type, data, event_id):
+    """Message SSE encodé (une ligne data: JSON)"""
+    payload = json.dumps(data, default=str, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class Subscription:
+    """File d'un abonné, consommée par une coroutine de sa boucle d'événements"""
+
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, message):
+        """Ajouter un message (None ferme le flux) ; un abonné trop lent est fermé"""
+        if self.closed:
+            return
+        if message is None or self.queue.full():
+            # Le navigateur se reconnecte et recharge le dashboard complet
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class EventBroker:
+    """Publication depuis n'importe quel thread, réception par les abonnés asyncio"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._offer, subscription, message)
+            except RuntimeError:
+                # Boucle fermée : l'abonné a disparu avec elle
+                self.unsubscribe(subscription)
+
+    def _offer(self, subscription, message):
+        if message is not None and subscription.queue.full():
+            self.dropped += 1
+        subscription.offer(message)
+
+    def publish(self, event_type, data):
+        """Diffuser un événement à tous les abonnés (sans effet s'il n'y en a aucun)"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._next_id += 1
+            event_id = self._next_id
+        self.published += 1
+        self._deliver(format_event(event_type, data, event_id))
+
+    def close(self):
+        """Terminer tous les flux (arrêt du serveur)"""
+        self._deliver(None)
+
+    def stats(self):
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {'subscribers': subscribers, 'published': self.published, 'dropped': self.dropped}
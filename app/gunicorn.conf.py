@@ -0,0 +1,61 @@
+"""
+Configuration gunicorn de l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Workers uvicorn : plusieurs processus, chacun avec une boucle asyncio. Les
+routes /api/* attendent MongoDB (motor) et WebHDFS (httpx) sans occuper de
+thread : un worker sert des centaines de requêtes simultanées. L'application
+n'est pas préchargée dans le maître : chaque worker importe asgi.py après
+le fork et crée ses propres clients (MongoDB, WebHDFS) et tâches de fond.
+Les caches de résultats et le moteur d'analyse en mémoire (une copie des
+ventes par worker, bornée par ANALYTICS_MAX_ROWS) sont propres à chaque
+worker ; les jobs Spark/Pig sont partagés via MongoDB. Les métriques
+Prometheus de chaque worker sont écrites dans PROMETHEUS_MULTIPROC_DIR et
+agrégées par /metrics.
+"""
+
+import os
+import shutil
+
+# Avant l'import de prometheus_client par les workers (hérité au fork)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-metrics')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_WORKERS', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = False
+
+# Requêtes longues (agrégations de repli) et arrêt propre
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Redémarrage périodique des workers (fuites mémoire éventuelles)
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('WEB_LOG_LEVEL', 'info')
+
+
+def worker_exit(server, worker):
+    """Arrêt propre des tâches de fond et des connexions du worker"""
+    try:
+        from main import shutdown_resources
+        shutdown_resources()
+    except Exception as e:
+        server.log.warning(f"Erreur arrêt du worker {worker.pid}: {e}")
+
+
+def on_starting(server):
+    """Repartir de métriques vides à chaque démarrage du serveur"""
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Les jauges du worker arrêté ne comptent plus (fichiers conservés pour les compteurs)"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,370 @@
+"""
+Client WebHDFS pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Lecture des résultats d'analyse directement via l'API REST du NameNode
+(port 9870) au lieu de lancer `hdfs dfs` (une JVM) via `docker exec`.
+Les connexions HTTP sont conservées dans un pool (requests.Session, une
+par processus) et les fichiers sont lus et écrits en flux.
+
+AsyncWebHDFSClient (httpx) sert les routes asyncio de l'application : une
+lecture HDFS lente n'y occupe aucun thread.
+"""
+
+import asyncio
+import io
+import os
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import WEBHDFS_REQUEST_DURATION
+
+
+# Lecture anticipée des fichiers en accès aléatoire : une requête OPEN
+# ramène au moins autant d'octets (les petites lectures voisines de pyarrow
+# sont servies depuis le tampon)
+READ_AHEAD = int(os.getenv('WEBHDFS_READ_AHEAD', str(1024 * 1024)))
+
+
+class WebHDFSError(Exception):
+    """Erreur renvoyée par l'API WebHDFS"""
+
+
+class WebHDFSClient:
+    """Client minimal WebHDFS (lecture, listage, création, renommage, suppression)"""
+
+    def __init__(self, base_url, user='hadoop', timeout=5, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.user = user
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Session HTTP du processus courant (recréée après un fork)"""
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                          pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session, self._pid = session, os.getpid()
+        return self._session
+
+    def _url(self, path):
+        return f"{self.base_url}/webhdfs/v1/{path.lstrip('/')}"
+
+    def _request(self, path, op, stream=False, **params):
+        params.update({'op': op, 'user.name': self.user})
+        started = time.perf_counter()
+        response = self.session.get(self._url(path), params=params,
+                                    timeout=self.timeout, stream=stream)
+        # En flux (OPEN), durée jusqu'aux en-têtes
+        WEBHDFS_REQUEST_DURATION.labels(op, 'sync').observe(time.perf_counter() - started)
+        if response.status_code == 404:
+            response.close()
+            return None
+        if response.status_code != 200:
+            message = response.text[:200]
+            response.close()
+            raise WebHDFSError(f"{op} {path}: HTTP {response.status_code} {message}")
+        return response
+
+    def _modify(self, method, path, op, **params):
+        params.update({'op': op, 'user.name': self.user})
+        response = self.session.request(method, self._url(path), params=params,
+                                        timeout=self.timeout)
+        if response.status_code not in (200, 201):
+            raise WebHDFSError(f"{op} {path}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    def mkdirs(self, path):
+        return self._modify('PUT', path, 'MKDIRS').json().get('boolean', False)
+
+    def rename(self, path, destination):
+        return self._modify('PUT', path, 'RENAME', destination=destination).json().get('boolean', False)
+
+    def delete(self, path, recursive=False):
+        return self._modify('DELETE', path, 'DELETE',
+                            recursive=str(recursive).lower()).json().get('boolean', False)
+
+    def create(self, path, data, overwrite=True, timeout=None):
+        """Écrire un fichier ; data peut être un générateur d'octets (envoi en flux)
+
+        Le NameNode répond par une redirection vers un DataNode, vers lequel
+        le contenu est envoyé (transfert chunked si data est un générateur).
+        """
+        params = {'op': 'CREATE', 'user.name': self.user, 'overwrite': str(overwrite).lower()}
+        response = self.session.put(self._url(path), params=params, timeout=self.timeout,
+                                    allow_redirects=False)
+        if response.status_code != 307:
+            raise WebHDFSError(f"CREATE {path}: HTTP {response.status_code} {response.text[:200]}")
+        location = response.headers['Location']
+        response = self.session.put(location, data=data, timeout=timeout)
+        if response.status_code != 201:
+            raise WebHDFSError(f"CREATE {path}: HTTP {response.status_code} {response.text[:200]}")
+
+    def get_file_status(self, path):
+        """Statut d'un fichier ou répertoire (None s'il n'existe pas)"""
+        response = self._request(path, 'GETFILESTATUS')
+        if response is None:
+            return None
+        return response.json()['FileStatus']
+
+    def exists(self, path):
+        return self.get_file_status(path) is not None
+
+    def list_status(self, path):
+        """Contenu d'un répertoire (None s'il n'existe pas)"""
+        response = self._request(path, 'LISTSTATUS')
+        if response is None:
+            return None
+        return response.json()['FileStatuses']['FileStatus']
+
+    def content_summary(self, path):
+        """Taille totale et nombre de fichiers d'un répertoire (None s'il n'existe pas)"""
+        response = self._request(path, 'GETCONTENTSUMMARY')
+        if response is None:
+            return None
+        return response.json()['ContentSummary']
+
+    def list_part_files(self, directory):
+        """Fichiers part-* non vides d'un répertoire de sortie Spark/Pig, triés"""
+        return part_files(directory, self.list_status(directory))
+
+    def iter_lines(self, path, chunk_size=64 * 1024):
+        """Lire un fichier ligne par ligne en flux (redirection DataNode suivie)"""
+        response = self._request(path, 'OPEN', stream=True)
+        if response is None:
+            raise WebHDFSError(f"OPEN {path}: fichier introuvable")
+        with response:
+            for line in response.iter_lines(chunk_size=chunk_size, decode_unicode=False):
+                if line:
+                    yield line.decode('utf-8')
+
+    def read_range(self, path, offset, length):
+        """Lire length octets à partir de offset (lecture partielle côté DataNode)"""
+        response = self._request(path, 'OPEN', offset=offset, length=length)
+        if response is None:
+            raise WebHDFSError(f"OPEN {path}: fichier introuvable")
+        return response.content
+
+    def open_file(self, path, buffer_size=READ_AHEAD):
+        """Fichier HDFS en accès aléatoire (lectures par plages d'octets)
+
+        Les lectures passent par un tampon de buffer_size octets
+        (io.BufferedReader) ; buffer_size=0 renvoie le fichier brut, une
+        requête par lecture.
+        """
+        status = self.get_file_status(path)
+        if status is None:
+            raise WebHDFSError(f"{path}: fichier introuvable")
+        raw = WebHDFSFile(self, path, status['length'])
+        if not buffer_size:
+            return raw
+        return io.BufferedReader(raw, buffer_size=buffer_size)
+
+    def iter_part_lines(self, directory):
+        """Lire en flux toutes les lignes des fichiers part-* d'un répertoire"""
+        for path in self.list_part_files(directory):
+            yield from self.iter_lines(path)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def part_files(directory, statuses):
+    """Chemins des fichiers part-* non vides d'un listage de répertoire, triés"""
+    if not statuses:
+        return []
+    return [
+        f"{directory.rstrip('/')}/{status['pathSuffix']}"
+        for status in sorted(statuses, key=lambda s: s['pathSuffix'])
+        if status['type'] == 'FILE'
+        and status['pathSuffix'].startswith('part-')
+        and status.get('length', 0) > 0
+    ]
+
+
+class AsyncWebHDFSClient:
+    """Client WebHDFS asyncio (lecture et listage seulement)
+
+    Un httpx.AsyncClient est lié à la boucle d'événements qui l'utilise :
+    il est créé à la première requête dans la boucle courante.
+    """
+
+    def __init__(self, base_url, user='hadoop', timeout=5, pool_size=100):
+        self.base_url = base_url.rstrip('/')
+        self.user = user
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._client = None
+        self._loop = None
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size)
+            )
+            self._loop = loop
+        return self._client
+
+    def _url(self, path):
+        return f"{self.base_url}/webhdfs/v1/{path.lstrip('/')}"
+
+    async def _request(self, path, op, **params):
+        params.update({'op': op, 'user.name': self.user})
+        started = time.perf_counter()
+        response = await self.client.get(self._url(path), params=params)
+        WEBHDFS_REQUEST_DURATION.labels(op, 'async').observe(time.perf_counter() - started)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise WebHDFSError(f"{op} {path}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def get_file_status(self, path):
+        response = await self._request(path, 'GETFILESTATUS')
+        if response is None:
+            return None
+        return response.json()['FileStatus']
+
+    async def exists(self, path):
+        return await self.get_file_status(path) is not None
+
+    async def list_status(self, path):
+        response = await self._request(path, 'LISTSTATUS')
+        if response is None:
+            return None
+        return response.json()['FileStatuses']['FileStatus']
+
+    async def list_part_files(self, directory):
+        return part_files(directory, await self.list_status(directory))
+
+    async def iter_chunks(self, path):
+        """Lire un fichier en flux par lots de lignes (générateur asynchrone)
+
+        Chaque lot regroupe les lignes complètes d'un morceau reçu ; une ligne
+        coupée en fin de morceau est complétée par le suivant.
+        """
+        params = {'op': 'OPEN', 'user.name': self.user}
+        started = time.perf_counter()
+        async with self.client.stream('GET', self._url(path), params=params) as response:
+            WEBHDFS_REQUEST_DURATION.labels('OPEN', 'async').observe(time.perf_counter() - started)
+            if response.status_code != 200:
+                await response.aread()
+                raise WebHDFSError(f"OPEN {path}: HTTP {response.status_code} {response.text[:200]}")
+            pending = ''
+            async for text in response.aiter_text():
+                lines = (pending + text).split('\n')
+                pending = lines.pop()
+                lines = [line.rstrip('\r') for line in lines if line.rstrip('\r')]
+                if lines:
+                    yield lines
+            if pending.rstrip('\r'):
+                yield [pending.rstrip('\r')]
+
+    async def iter_lines(self, path):
+        """Lire un fichier ligne par ligne en flux (générateur asynchrone)"""
+        async for lines in self.iter_chunks(path):
+            for line in lines:
+                yield line
+
+    async def read_part_lines(self, directory):
+        """Lots de lignes des fichiers part-* d'un répertoire (générateur
+        asynchrone : un seul morceau en mémoire à la fois)"""
+        for path in await self.list_part_files(directory):
+            async for lines in self.iter_chunks(path):
+                yield lines
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class WebHDFSFile(io.RawIOBase):
+    """Fichier en lecture seule avec seek, pour les lecteurs qui ont besoin d'un
+    accès aléatoire (pied de page et colonnes d'un fichier Parquet)
+
+    Chaque readinto est une requête OPEN : open_file l'enveloppe dans un
+    io.BufferedReader pour la lecture anticipée.
+    """
+
+    def __init__(self, client, path, size):
+        self.client = client
+        self.path = path
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        data = self.client.read_range(self.path, self.position, length)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self.position
+        buffer = bytearray(max(size, 0))
+        count = self.readinto(buffer)
+        return bytes(buffer[:count])
+
+
+def client_from_env():
+    """Construire le client WebHDFS à partir des variables d'environnement"""
+    host = os.getenv('HADOOP_MASTER', 'hadoop-master')
+    return WebHDFSClient(
+        os.getenv('WEBHDFS_URL', f"http://{host}:9870"),
+        user=os.getenv('HDFS_USER', 'hadoop'),
+        timeout=float(os.getenv('WEBHDFS_TIMEOUT', '5')),
+        pool_size=int(os.getenv('WEBHDFS_POOL_SIZE', '10'))
+    )
+
+
+def async_client_from_env():
+    """Client WebHDFS asyncio, mêmes variables d'environnement"""
+    host = os.getenv('HADOOP_MASTER', 'hadoop-master')
+    return AsyncWebHDFSClient(
+        os.getenv('WEBHDFS_URL', f"http://{host}:9870"),
+        user=os.getenv('HDFS_USER', 'hadoop'),
+        timeout=float(os.getenv('WEBHDFS_TIMEOUT', '5')),
+        pool_size=int(os.getenv('WEBHDFS_ASYNC_POOL_SIZE', '100'))
+    )
@@ -0,0 +1,166 @@
+"""
+Surveillance de l'état du cluster pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les services (NameNode, YARN, Spark Master, MongoDB) sont sondés en
+parallèle par un thread de fond, directement en HTTP quand c'est possible.
+Les endpoints servent le dernier instantané sans attendre les sondes.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+
+class ProbeResult:
+    """Résultat d'une sonde"""
+
+    def __init__(self, online, latency_ms, details=None, error=None):
+        self.online = online
+        self.latency_ms = latency_ms
+        self.details = details or {}
+        self.error = error
+        self.checked_at = datetime.now()
+
+    def to_dict(self):
+        result = {
+            'online': self.online,
+            'latency_ms': self.latency_ms,
+            'checked_at': self.checked_at.isoformat(),
+            'details': self.details
+        }
+        if self.error:
+            result['error'] = self.error
+        return result
+
+
+def http_probe(session, url, timeout, parse=None):
+    """Construire une sonde HTTP (parse extrait les détails de la réponse JSON)"""
+    def probe():
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return parse(response.json()) if parse else {}
+    return probe
+
+
+def namenode_details(payload):
+    beans = payload.get('beans') or [{}]
+    state = beans[0]
+    return {
+        'live_datanodes': state.get('NumLiveDataNodes'),
+        'dead_datanodes': state.get('NumDeadDataNodes'),
+        'capacity_total': state.get('CapacityTotal'),
+        'capacity_used': state.get('CapacityUsed')
+    }
+
+
+def yarn_details(payload):
+    info = payload.get('clusterInfo', {})
+    return {'state': info.get('state'), 'hadoop_version': info.get('hadoopVersion')}
+
+
+def spark_details(payload):
+    return {
+        'status': payload.get('status'),
+        'alive_workers': payload.get('aliveworkers', len(payload.get('workers', [])))
+    }
+
+
+class HealthMonitor:
+    """Planificateur de sondes exécutées en parallèle à intervalle régulier"""
+
+    def __init__(self, probes, interval=15, on_change=None):
+        self.probes = probes
+        self.interval = interval
+        # Appelé avec (instantané, services dont l'état en ligne a changé)
+        self.on_change = on_change
+        self._executor = ThreadPoolExecutor(max_workers=max(len(probes), 1),
+                                            thread_name_prefix='health-probe')
+        self._snapshot = {}
+        self._snapshot_time = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run_probe(self, probe):
+        start = time.perf_counter()
+        try:
+            details = probe()
+            return ProbeResult(True, round((time.perf_counter() - start) * 1000, 1), details)
+        except Exception as e:
+            return ProbeResult(False, round((time.perf_counter() - start) * 1000, 1), error=str(e))
+
+    def refresh(self):
+        """Exécuter toutes les sondes en parallèle et publier un nouvel instantané"""
+        with self._refresh_lock:
+            futures = {name: self._executor.submit(self._run_probe, probe)
+                       for name, probe in self.probes.items()}
+            snapshot = {name: future.result() for name, future in futures.items()}
+            with self._lock:
+                previous = self._snapshot
+                self._snapshot = snapshot
+                self._snapshot_time = time.monotonic()
+            changed = [name for name, result in snapshot.items()
+                       if name in previous and previous[name].online != result.online]
+            if changed and self.on_change is not None:
+                try:
+                    self.on_change(snapshot, changed)
+                except Exception as e:
+                    print(f"Erreur notification santé: {e}")
+            return snapshot
+
+    def snapshot(self):
+        """Dernier instantané et son âge en secondes (sondage immédiat si aucun)"""
+        with self._lock:
+            snapshot, snapshot_time = self._snapshot, self._snapshot_time
+        if snapshot_time is None:
+            snapshot = self.refresh()
+            snapshot_time = self._snapshot_time
+        return snapshot, round(time.monotonic() - snapshot_time, 1)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erreur sondes santé: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+
+def monitor_from_env(mongo_manager, on_change=None):
+    """Construire le moniteur des services du cluster à partir de l'environnement"""
+    host = os.getenv('HADOOP_MASTER', 'hadoop-master')
+    timeout = float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+    session = requests.Session()
+
+    def mongodb_probe():
+        if not mongo_manager.ping():
+            raise RuntimeError('MongoDB indisponible')
+        return {'version': mongo_manager.client.server_info().get('version', 'Unknown')}
+
+    probes = {
+        'namenode': http_probe(
+            session,
+            f"http://{host}:9870/jmx?qry=Hadoop:service=NameNode,name=FSNamesystemState",
+            timeout, namenode_details
+        ),
+        'yarn': http_probe(session, f"http://{host}:8088/ws/v1/cluster/info", timeout, yarn_details),
+        'spark': http_probe(session, f"http://{host}:8080/json/", timeout, spark_details),
+        'mongodb': mongodb_probe
+    }
+    return HealthMonitor(probes, interval=int(os.getenv('HEALTH_PROBE_INTERVAL', '15')),
+                         on_change=on_change)
@@ -0,0 +1,162 @@
+"""
+Réponses conditionnelles, pagination et compression pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+L'ETag d'une analyse est dérivé de la version des données (dates de
+modification des sorties Spark/Pig, watermark des ventes) : une requête
+dont l'ETag est inchangé reçoit un 304 sans que l'analyse soit relue.
+Les listes peuvent être paginées (?page=&page_size=) ou tronquées
+(?top_n=) ; le corps reste une liste JSON, la pagination est décrite
+dans les en-têtes X-Total-Count et Link. Les réponses volumineuses sont
+compressées (brotli si le module est installé, sinon gzip).
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_PAGE_SIZE = 1000
+
+
+def make_etag(*parts):
+    """Empreinte stable des éléments qui déterminent une réponse"""
+    digest = hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:20]
+
+
+def last_modified_from(*timestamps):
+    """Date la plus récente parmi des dates datetime ou des millisecondes epoch"""
+    dates = []
+    for value in timestamps:
+        if isinstance(value, (int, float)):
+            dates.append(datetime.fromtimestamp(value / 1000, tz=timezone.utc))
+        elif isinstance(value, datetime):
+            dates.append(value if value.tzinfo else value.replace(tzinfo=timezone.utc))
+    return max(dates).replace(microsecond=0) if dates else None
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """If-None-Match prime sur If-Modified-Since (RFC 9110)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified=None):
+    """ETag faible (le corps peut être compressé) et revalidation à chaque usage"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _positive_int(args, name, maximum=None):
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} doit être un entier")
+    if number < 1:
+        raise ValueError(f"{name} doit être un entier positif")
+    if maximum is not None and number > maximum:
+        raise ValueError(f"{name} ne peut pas dépasser {maximum}")
+    return number
+
+
+def pagination_from_args(args):
+    """(top_n, page, page_size) depuis la query string (ValueError si invalide)"""
+    top_n = _positive_int(args, 'top_n')
+    page = _positive_int(args, 'page')
+    page_size = _positive_int(args, 'page_size', MAX_PAGE_SIZE)
+    if page_size is not None and page is None:
+        page = 1
+    if page is not None and page_size is None:
+        page_size = 50
+    return top_n, page, page_size
+
+
+def top_from_args(args, default, maximum):
+    """Nombre d'éléments demandés avec ?top= (default si absent, ValueError si invalide)"""
+    top = _positive_int(args, 'top', maximum)
+    return default if top is None else top
+
+
+def _page_url(path, args, page, page_size):
+    query = dict(args.items()) if args else {}
+    query.update(page=page, page_size=page_size)
+    return f"{path}?{urlencode(query)}"
+
+
+def paginate(items, sort_key, top_n=None, page=None, page_size=None, path='', args=None):
+    """Trier par sort_key décroissant puis tronquer/paginer
+
+    Retourne (éléments, en-têtes). Sans paramètre, la liste est renvoyée
+    telle quelle. Les liens next/prev reprennent les autres paramètres de
+    la requête (args).
+    """
+    if top_n is None and page is None:
+        return items, {}
+    items = sorted(items, key=lambda item: item.get(sort_key) or 0, reverse=True)
+    if top_n is not None:
+        items = items[:top_n]
+    total = len(items)
+    headers = {'X-Total-Count': str(total)}
+    if page is None:
+        return items, headers
+
+    start = (page - 1) * page_size
+    links = []
+    if start + page_size < total:
+        links.append(f'<{_page_url(path, args, page + 1, page_size)}>; rel="next"')
+    if page > 1:
+        links.append(f'<{_page_url(path, args, page - 1, page_size)}>; rel="prev"')
+    if links:
+        headers['Link'] = ', '.join(links)
+    return items[start:start + page_size], headers
+
+
+def choose_encoding(accept_encodings):
+    """Meilleur codage accepté par le client parmi br et gzip (None sinon)"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+async def compress_response(response, accept_encodings, min_size=1024):
+    """Compresser un corps JSON/HTML d'au moins min_size octets
+
+    Les flux (text/event-stream), les réponses vides et celles déjà
+    codées sont laissés tels quels.
+    """
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in ('application/json', 'text/html'):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+    data = await response.get_data()
+    if len(data) < min_size:
+        return response
+    if encoding == 'br':
+        data = brotli.compress(data, quality=5)
+    else:
+        data = gzip.compress(data, compresslevel=6)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,113 @@
+"""
+Gestion des index MongoDB pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les index nécessaires aux requêtes du dashboard sont créés (de manière
+idempotente) puis vérifiés au démarrage.
+"""
+
+import pymongo
+
+# collection -> liste de (clé, options)
+REQUIRED_INDEXES = {
+    'customers': [
+        ([('id', pymongo.ASCENDING)], {}),
+    ],
+    'sales': [
+        ([('product', pymongo.ASCENDING)], {}),
+        ([('customer_id', pymongo.ASCENDING)], {}),
+        ([('date', pymongo.ASCENDING)], {}),
+    ],
+    'product_rollup': [
+        ([('total_revenue', pymongo.DESCENDING)], {}),
+    ],
+    # Résultats Spark (créés par mongodb_reader.py avant chaque publication)
+    'product_analysis': [
+        ([('total_revenue', pymongo.DESCENDING)], {}),
+        ([('product', pymongo.ASCENDING)], {}),
+    ],
+    'city_analysis': [
+        ([('city_revenue', pymongo.DESCENDING)], {}),
+        ([('city', pymongo.ASCENDING)], {}),
+    ],
+    'customer_analysis': [
+        ([('customer_total', pymongo.DESCENDING)], {}),
+        ([('customer_id', pymongo.ASCENDING)], {}),
+    ],
+    # Cubes de tendances (requêtes par plage, filtrées par produit ou ville)
+    'rollup_daily': [
+        ([('date', pymongo.ASCENDING)], {}),
+        ([('product', pymongo.ASCENDING), ('date', pymongo.ASCENDING)], {}),
+        ([('city', pymongo.ASCENDING), ('date', pymongo.ASCENDING)], {}),
+    ],
+    'rollup_monthly': [
+        ([('month', pymongo.ASCENDING)], {}),
+        ([('product', pymongo.ASCENDING), ('month', pymongo.ASCENDING)], {}),
+        ([('city', pymongo.ASCENDING), ('month', pymongo.ASCENDING)], {}),
+    ],
+}
+
+
+def _index_keys(collection):
+    return [list(index['key'].items()) for index in collection.list_indexes()]
+
+
+def ensure_indexes(db, required=None):
+    """Créer les index manquants et retourner le rapport de vérification"""
+    required = REQUIRED_INDEXES if required is None else required
+    report = {}
+    for collection_name, indexes in required.items():
+        collection = db[collection_name]
+        for keys, options in indexes:
+            try:
+                collection.create_index(keys, background=True, **options)
+            except Exception as e:
+                print(f"Erreur création index {collection_name} {keys}: {e}")
+        report[collection_name] = verify_indexes(db, collection_name, indexes)
+    return report
+
+
+def verify_indexes(db, collection_name, indexes):
+    """Vérifier la présence de chaque index attendu sur une collection"""
+    try:
+        existing = _index_keys(db[collection_name])
+    except Exception as e:
+        print(f"Erreur lecture des index de {collection_name}: {e}")
+        existing = []
+    status = {}
+    for keys, _ in indexes:
+        name = '_'.join(f"{field}_{direction}" for field, direction in keys)
+        status[name] = [list(k) for k in keys] in [[list(k) for k in e] for e in existing]
+        if not status[name]:
+            print(f"⚠️ Index manquant sur {collection_name}: {name}")
+    return status
+
+
+def explain_aggregation(db, collection_name, pipeline):
+    """Plan d'exécution d'une agrégation (étapes et index utilisés)"""
+    explain = db.command('aggregate', collection_name, pipeline=pipeline, explain=True)
+    return {
+        'stages': _stage_names(explain),
+        'indexes_used': sorted(set(_find_values(explain, 'indexName'))),
+        'lookup_strategy': sorted(set(_find_values(explain, 'strategy'))),
+        'raw': explain
+    }
+
+
+def _stage_names(explain):
+    if 'stages' in explain:
+        return [next(iter(stage)) for stage in explain['stages']]
+    return list(_find_values(explain, 'stage'))
+
+
+def _find_values(node, field):
+    """Parcourir récursivement un plan d'exécution et extraire les valeurs d'un champ"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == field and isinstance(value, str):
+                yield value
+            else:
+                yield from _find_values(value, field)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _find_values(item, field)
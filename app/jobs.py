@@ -0,0 +1,518 @@
+"""
+Exécution asynchrone des analyses Spark et Pig
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les analyses sont lancées dans le conteneur hadoop-master (docker exec),
+depuis un pool borné de threads : la requête HTTP qui soumet un job
+retourne immédiatement, l'avancement est consulté ensuite par son id.
+Un seul job actif par type d'analyse (même répertoire de sortie et même
+état d'agrégats) : une soumission identique renvoie le job en cours.
+
+Le job tourne dans son propre groupe de processus du conteneur (setsid),
+dont le PID est écrit dans un fichier : le délai maximal et l'arrêt du
+serveur l'interrompent dans le conteneur (docker exec kill), pas seulement
+le client docker exec local, et le type de job n'est libéré qu'une fois
+ce groupe terminé.
+
+Avec plusieurs workers (gunicorn), les jobs sont enregistrés dans la
+collection MongoDB `jobs` : un index unique partiel sur les jobs actifs
+garantit l'unicité par type entre workers, et n'importe quel worker peut
+répondre à GET /api/jobs/<id>. Sans MongoDB, le suivi reste local.
+"""
+
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pymongo
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from metrics import JOB_DURATION
+from partitions import input_glob, list_partitions, parse_date
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+# Fichiers PID des jobs dans le conteneur (un par job)
+PID_DIR = '/tmp/bigdata-jobs'
+
+SPARK_JARS = ("/opt/hadoop/share/hadoop/common/lib/mongo-hadoop-core-2.0.2.jar,"
+              "/opt/hadoop/share/hadoop/common/lib/mongodb-driver-3.12.11.jar")
+
+
+class JobError(Exception):
+    """Soumission de job invalide (type inconnu, option invalide, conflit)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Job:
+    """Exécution d'une analyse : état, durée, taille des sorties et fin du journal"""
+
+    def __init__(self, kind, options, command, output_dir, log_lines=50):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.options = options
+        self.command = command
+        self.output_dir = output_dir
+        self.state = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.return_code = None
+        self.output_bytes = None
+        self.error = None
+        self.log = deque(maxlen=log_lines)
+
+    @property
+    def duration_s(self):
+        if self.started_at is None:
+            return None
+        return round((self.finished_at or time.time()) - self.started_at, 1)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Job enregistré par un autre worker (lecture seule)"""
+        job = cls.__new__(cls)
+        for field in ('id', 'kind', 'options', 'state', 'submitted_at', 'started_at',
+                      'finished_at', 'return_code', 'output_dir', 'output_bytes', 'error'):
+            setattr(job, field, data.get(field))
+        job.command = None
+        job.log = deque(data.get('log_tail') or [])
+        return job
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'options': self.options,
+            'state': self.state,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration_s': self.duration_s,
+            'return_code': self.return_code,
+            'output_dir': self.output_dir,
+            'output_bytes': self.output_bytes,
+            'error': self.error,
+            'log_tail': list(self.log)
+        }
+
+
+def _period(options):
+    """(début, fin) validés depuis les options start_date/end_date (chaînes)"""
+    start, end = options.get('start_date'), options.get('end_date')
+    try:
+        return (parse_date(start) if start else None, parse_date(end) if end else None)
+    except (TypeError, ValueError):
+        raise JobError("start_date/end_date doivent être au format YYYY-MM-DD")
+
+
+def _positive_int(options, name):
+    """Option entière strictement positive (None si absente), JobError sinon"""
+    value = options.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        # Entier JSON ou chaîne de chiffres ; ni booléen ni nombre décimal
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(value)
+        number = int(value)
+    except ValueError:
+        raise JobError(f"{name} doit être un entier positif")
+    if number < 1:
+        raise JobError(f"{name} doit être un entier positif")
+    return number
+
+
+def _check_options(options, allowed):
+    """Options d'un job : dictionnaire sans clé inconnue (JobError sinon)"""
+    if not isinstance(options, dict):
+        raise JobError("options doit être un objet JSON")
+    unknown = sorted(set(options) - set(allowed))
+    if unknown:
+        raise JobError(f"Options inconnues: {', '.join(unknown)} (attendu: {', '.join(allowed)})")
+    if not isinstance(options.get('incremental', False), bool):
+        raise JobError("incremental doit être un booléen")
+
+
+def _period_name(start, end):
+    return f"{start.isoformat() if start else 'debut'}_{end.isoformat() if end else 'fin'}"
+
+
+def spark_command(options, hdfs_client, container):
+    """Commande spark-submit de mongodb_reader.py (dans le conteneur) et répertoire de sortie"""
+    _check_options(options, ('incremental', 'source', 'start_date', 'end_date', 'shuffle_partitions'))
+    args = []
+    start, end = _period(options)
+    source = options.get('source', 'mongodb')
+    if source not in ('mongodb', 'hdfs'):
+        raise JobError("source doit valoir 'mongodb' ou 'hdfs'")
+    if source == 'hdfs':
+        args += ['--source', 'hdfs']
+    if options.get('incremental'):
+        if start or end or source == 'hdfs':
+            raise JobError("incremental ne s'applique qu'à l'historique complet lu depuis MongoDB")
+        args.append('--incremental')
+    if start:
+        args += ['--start-date', start.isoformat()]
+    if end:
+        args += ['--end-date', end.isoformat()]
+    shuffle_partitions = _positive_int(options, 'shuffle_partitions')
+    if shuffle_partitions:
+        args += ['--shuffle-partitions', str(shuffle_partitions)]
+
+    output_dir = f"/spark-output/period/{_period_name(start, end)}" if start or end else '/spark-output'
+    command = ['spark-submit', '--jars', SPARK_JARS, '/scripts/spark/mongodb_reader.py'] + args
+    return command, output_dir
+
+
+def pig_command(options, hdfs_client, container):
+    """Commande pig de data_analysis.pig ; une période est traduite en glob de partitions"""
+    _check_options(options, ('start_date', 'end_date'))
+    start, end = _period(options)
+    command = ['pig']
+    output_dir = '/pig-output'
+    if start or end:
+        days = list_partitions(hdfs_client, '/data/sales.csv', start, end)
+        if not days:
+            raise JobError("Aucune partition de ventes pour cette période", status=422)
+        output_dir = f"/pig-output/period/{_period_name(start, end)}"
+        command += ['-param', f"SALES_INPUT={input_glob('/data/sales.csv', days)}",
+                    '-param', f"OUTPUT={output_dir}", '-param', 'PERIOD=true']
+        if start:
+            command += ['-param', f"START_DATE={start.isoformat()}"]
+        if end:
+            command += ['-param', f"END_DATE={end.isoformat()}"]
+    command += ['-f', '/scripts/pig/data_analysis.pig']
+    return command, output_dir
+
+
+JOB_KINDS = {
+    'spark': spark_command,
+    'pig': pig_command
+}
+
+
+class JobRunner:
+    """Pool borné d'exécution des jobs, avec historique des derniers jobs
+
+    get_db (optionnel) retourne la base MongoDB où les jobs sont partagés
+    entre workers ; None ou une erreur MongoDB ramènent au suivi local.
+    """
+
+    def __init__(self, hdfs_client, on_finish=None, max_workers=2, history=50,
+                 timeout=3600, container='hadoop-master', get_db=None, persist_interval=5,
+                 kill_grace=15):
+        self.hdfs_client = hdfs_client
+        self.on_finish = on_finish
+        self.timeout = timeout
+        # Délai entre SIGTERM et SIGKILL lors de l'arrêt d'un job
+        self.kill_grace = kill_grace
+        self.container = container
+        self.history = history
+        self.get_db = get_db
+        self.persist_interval = persist_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._store_ready = False
+
+    # --- Stockage partagé (MongoDB) ---
+
+    def _collection(self):
+        if self.get_db is None:
+            return None
+        try:
+            collection = self.get_db().jobs
+            if not self._store_ready:
+                collection.create_index('kind', unique=True, name='one_active_job_per_kind',
+                                        partialFilterExpression={'active': True})
+                collection.create_index([('submitted_at', pymongo.DESCENDING)])
+                self._store_ready = True
+            return collection
+        except Exception as e:
+            print(f"Suivi des jobs local (MongoDB indisponible): {e}")
+            return None
+
+    def _document(self, job):
+        data = job.to_dict()
+        data['_id'] = data.pop('id')
+        data['active'] = job.state in ACTIVE_STATES
+        if not data['active']:
+            # L'index partiel ne porte que sur les documents où active vaut true
+            del data['active']
+        return data
+
+    def _persist(self, job):
+        collection = self._collection()
+        if collection is None:
+            return
+        try:
+            collection.replace_one({'_id': job.id}, self._document(job), upsert=True)
+        except PyMongoError as e:
+            print(f"Erreur enregistrement du job {job.id}: {e}")
+
+    def _claim(self, job):
+        """Réserver le type de job entre workers ; retourne le job actif concurrent ou None"""
+        collection = self._collection()
+        if collection is None:
+            return None
+        for _ in range(2):
+            try:
+                collection.insert_one(self._document(job))
+                return None
+            except DuplicateKeyError:
+                existing = collection.find_one({'kind': job.kind, 'active': True})
+                if existing is None:
+                    continue
+                # Un worker arrêté brutalement laisse un job actif au-delà du délai maximal
+                if existing['submitted_at'] + self.timeout + 60 < time.time():
+                    collection.update_one(
+                        {'_id': existing['_id'], 'active': True},
+                        {'$set': {'state': JOB_FAILED, 'error': 'Job abandonné'},
+                         '$unset': {'active': ''}}
+                    )
+                    continue
+                existing['id'] = existing.pop('_id')
+                return Job.from_dict(existing)
+            except PyMongoError as e:
+                print(f"Suivi des jobs local (MongoDB indisponible): {e}")
+                return None
+        return None
+
+    # --- Soumission et consultation ---
+
+    def submit(self, kind, options=None):
+        """Soumettre un job ; retourne (job, créé). Ne bloque pas sur l'exécution.
+
+        Si un job du même type est actif avec les mêmes options, il est
+        renvoyé (créé = False) ; avec d'autres options, JobError 409.
+        """
+        if options is not None and not isinstance(options, dict):
+            raise JobError("options doit être un objet JSON")
+        options = dict(options or {})
+        if kind not in JOB_KINDS:
+            raise JobError(f"Type de job inconnu: {kind} (attendu: {', '.join(JOB_KINDS)})")
+        command, output_dir = JOB_KINDS[kind](options, self.hdfs_client, self.container)
+
+        with self._lock:
+            active = self._active.get(kind)
+            if active is None:
+                job = Job(kind, options, command, output_dir)
+                active = self._claim(job)
+                if active is None:
+                    self._active[kind] = job
+                    self._jobs[job.id] = job
+                    self._trim_locked()
+        if active is not None:
+            if active.options == options:
+                return active, False
+            raise JobError(f"Un job {kind} est déjà en cours ({active.id})", status=409)
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def _trim_locked(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state not in ACTIVE_STATES]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _stored(self, query=None, limit=None):
+        collection = self._collection()
+        if collection is None:
+            return None
+        try:
+            cursor = collection.find(query or {}).sort('submitted_at', pymongo.DESCENDING)
+            if limit:
+                cursor = cursor.limit(limit)
+            jobs = []
+            for document in cursor:
+                document['id'] = document.pop('_id')
+                jobs.append(Job.from_dict(document))
+            return jobs
+        except PyMongoError as e:
+            print(f"Erreur lecture des jobs: {e}")
+            return None
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            stored = self._stored({'_id': job_id}, limit=1)
+            job = stored[0] if stored else None
+        return job
+
+    def list(self):
+        stored = self._stored(limit=self.history)
+        if stored is not None:
+            return stored
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def latest(self, kind):
+        """Dernier job soumis d'un type (None si aucun)"""
+        stored = self._stored({'kind': kind}, limit=1)
+        if stored:
+            return stored[0]
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.kind == kind:
+                    return job
+        return None
+
+    # --- Exécution ---
+
+    def _pidfile(self, job):
+        return f"{PID_DIR}/{job.id}.pid"
+
+    def _docker_command(self, job):
+        """docker exec du job dans un nouveau groupe de processus, PID enregistré"""
+        return ['docker', 'exec', self.container, 'setsid', 'sh', '-c',
+                f'mkdir -p {PID_DIR} && echo $$ > "$0" && exec "$@"',
+                self._pidfile(job)] + job.command
+
+    def _container_sh(self, job, script):
+        """Exécuter un script sh dans le conteneur (True si son code de retour est 0)"""
+        try:
+            result = subprocess.run(['docker', 'exec', self.container, 'sh', '-c', script],
+                                    capture_output=True, timeout=30)
+        except (OSError, subprocess.SubprocessError) as e:
+            # Conteneur injoignable : l'état du job ne peut pas être vérifié
+            print(f"Erreur docker exec pour le job {job.id}: {e}")
+            return False
+        return result.returncode == 0
+
+    def _signal(self, job, signal):
+        """Envoyer un signal au groupe de processus du job dans le conteneur"""
+        return self._container_sh(
+            job, f'pid=$(cat {self._pidfile(job)} 2>/dev/null) && kill -{signal} -"$pid" 2>/dev/null'
+        )
+
+    def _alive(self, job):
+        """Un processus du groupe du job tourne-t-il encore (zombies exclus) ?"""
+        return self._container_sh(job, (
+            f'pid=$(cat {self._pidfile(job)} 2>/dev/null) || exit 1; '
+            'for stat in /proc/[0-9]*/stat; do '
+            'read -r line < "$stat" 2>/dev/null || continue; '
+            'set -- ${line##*) }; '
+            '[ "$1" != Z ] && [ "$3" = "$pid" ] && exit 0; '
+            'done; exit 1'
+        ))
+
+    def _wait_remote(self, job, timeout):
+        """Attendre la fin du groupe du job dans le conteneur (True s'il est terminé)"""
+        deadline = time.monotonic() + timeout
+        while self._alive(job):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(1)
+        return True
+
+    def _kill(self, job):
+        """Arrêter le job dans le conteneur (SIGTERM puis SIGKILL), puis le client local"""
+        if self._signal(job, 'TERM') and not self._wait_remote(job, self.kill_grace):
+            self._signal(job, 'KILL')
+            self._wait_remote(job, self.kill_grace)
+        process = getattr(job, 'process', None)
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _remove_pidfile(self, job):
+        try:
+            subprocess.run(['docker', 'exec', self.container, 'rm', '-f', self._pidfile(job)],
+                           capture_output=True, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    def _on_timeout(self, job):
+        job.state = JOB_FAILED
+        job.error = f"Délai dépassé ({self.timeout} s)"
+        self._kill(job)
+
+    def _run(self, job):
+        if job.state != JOB_QUEUED:
+            return
+        job.state = JOB_RUNNING
+        job.started_at = time.time()
+        self._persist(job)
+        print(f"Job {job.kind} {job.id} démarré: {' '.join(job.command)}")
+        process = None
+        try:
+            process = subprocess.Popen(self._docker_command(job), stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, text=True)
+            job.process = process
+            timer = threading.Timer(self.timeout, self._on_timeout, args=(job,))
+            timer.start()
+            try:
+                persisted_at = time.monotonic()
+                for line in process.stdout:
+                    job.log.append(line.rstrip())
+                    if time.monotonic() - persisted_at >= self.persist_interval:
+                        self._persist(job)
+                        persisted_at = time.monotonic()
+                job.return_code = process.wait()
+            finally:
+                timer.cancel()
+            if job.return_code == 0:
+                job.state = JOB_SUCCEEDED
+            elif job.state == JOB_RUNNING:
+                job.state = JOB_FAILED
+                job.error = f"Code de retour {job.return_code}"
+        except Exception as e:
+            job.state = JOB_FAILED
+            job.error = str(e)
+        finally:
+            # Le client docker exec peut s'arrêter avant le job (connexion au
+            # démon perdue) : le type reste réservé jusqu'à la fin du groupe
+            if process is not None:
+                if not self._wait_remote(job, self.timeout):
+                    self._kill(job)
+                self._remove_pidfile(job)
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.kind) is job:
+                    del self._active[job.kind]
+        JOB_DURATION.labels(job.kind, job.state).observe(job.finished_at - job.started_at)
+        print(f"Job {job.kind} {job.id} terminé: {job.state} en {job.duration_s} s")
+
+        if job.state == JOB_SUCCEEDED:
+            try:
+                summary = self.hdfs_client.content_summary(job.output_dir)
+                job.output_bytes = summary['length'] if summary else 0
+            except Exception as e:
+                print(f"Erreur taille des sorties {job.output_dir}: {e}")
+        self._persist(job)
+
+        if job.state == JOB_SUCCEEDED and self.on_finish:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                print(f"Erreur après le job {job.id}: {e}")
+
+    def shutdown(self):
+        """Arrêt du worker : les jobs en attente ou en cours sont marqués en échec
+
+        Les jobs en cours sont interrompus dans le conteneur pour libérer le
+        type de job ; l'analyse relancée reprendra depuis son état HDFS.
+        """
+        with self._lock:
+            active = list(self._active.values())
+        for job in active:
+            job.error = "Arrêt du serveur"
+            if job.state == JOB_QUEUED:
+                job.state = JOB_FAILED
+                job.finished_at = time.time()
+                self._persist(job)
+            else:
+                job.state = JOB_FAILED
+                self._kill(job)
+        self._executor.shutdown(wait=True)
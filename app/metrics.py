@@ -0,0 +1,160 @@
+"""
+Métriques Prometheus de l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les mesures sont faites en mémoire sur le chemin des requêtes (quelques
+microsecondes : compteur ou histogramme déjà résolu) et ne sont agrégées
+qu'au moment où /metrics est lu. Sous gunicorn, PROMETHEUS_MULTIPROC_DIR
+(défini par gunicorn.conf.py) fait écrire chaque worker dans ses propres
+fichiers ; /metrics agrège alors tous les workers, quel que soit celui qui
+répond.
+"""
+
+import functools
+import inspect
+import os
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+                               REGISTRY, generate_latest, multiprocess)
+from pymongo import monitoring
+
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+# Requêtes HTTP (étiquette = modèle de route, pas l'URL : cardinalité bornée)
+REQUEST_DURATION = Histogram(
+    'dashboard_request_duration_seconds', "Durée des requêtes HTTP par route",
+    ['endpoint', 'method', 'status']
+)
+
+# Sources des analyses : résultats Spark dans MongoDB, sorties HDFS, agrégation
+SOURCE_REQUESTS = Counter(
+    'dashboard_source_requests_total', "Consultations des sources de données par résultat",
+    ['analysis', 'source', 'result']
+)
+SOURCE_DURATION = Histogram(
+    'dashboard_source_duration_seconds', "Durée de lecture d'une source (hors cache)",
+    ['source']
+)
+
+# Cache des résultats d'analyse
+CACHE_REQUESTS = Counter(
+    'dashboard_cache_requests_total', "Accès au cache des résultats", ['result']
+)
+
+# Appels aux services
+MONGO_COMMAND_DURATION = Histogram(
+    'dashboard_mongodb_command_duration_seconds', "Durée des commandes MongoDB",
+    ['command', 'status'],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    'dashboard_mongodb_pool_connections', "Connexions MongoDB ouvertes et utilisées",
+    ['state'], multiprocess_mode='livesum'
+)
+WEBHDFS_REQUEST_DURATION = Histogram(
+    'dashboard_webhdfs_request_duration_seconds', "Durée des appels WebHDFS",
+    ['op', 'client']
+)
+JOB_DURATION = Histogram(
+    'dashboard_job_duration_seconds', "Durée des jobs Spark/Pig (docker exec)",
+    ['kind', 'state'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+)
+SSE_SUBSCRIBERS = Gauge(
+    'dashboard_sse_subscribers', "Flux /api/events ouverts", multiprocess_mode='livesum'
+)
+
+
+def timed(histogram, **labels):
+    """Décorateur : durée de chaque appel (fonction ou coroutine) dans histogram
+
+    L'enfant étiqueté est résolu une fois, à la décoration.
+    """
+    child = histogram.labels(**labels) if labels else histogram
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Durée de chaque commande MongoDB (mesurée par le pilote)"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, 'ok').observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, 'error').observe(event.duration_micros / 1e6)
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Connexions ouvertes et empruntées dans les pools MongoDB"""
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels('open').inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels('open').dec()
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_CONNECTIONS.labels('in_use').inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CONNECTIONS.labels('in_use').dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+
+def mongo_listeners():
+    """Écouteurs à passer aux clients MongoDB (event_listeners)"""
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
+
+
+def render():
+    """(corps, type de contenu) de /metrics, tous workers confondus"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,206 @@
+"""
+Client MongoDB partagé pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Un seul pymongo.MongoClient par processus : les requêtes réutilisent les
+sockets du pool au lieu de refaire connexion + authentification + ping.
+La surveillance du serveur est faite en tâche de fond par les threads de
+monitoring de pymongo (heartbeat), jamais sur le chemin d'une requête.
+
+Le client est créé à la première utilisation, dans le processus qui s'en
+sert : avec un serveur multi-processus (gunicorn), chaque worker crée le
+sien après le fork (un MongoClient ne doit pas traverser un fork).
+
+Les routes asyncio utilisent un client motor (AsyncMongoClientManager),
+lié à la boucle d'événements du worker.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pymongo
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+class MongoClientManager:
+    """Gestionnaire du client MongoDB partagé (pool de connexions)"""
+
+    def __init__(self, uri, max_pool_size=50, min_pool_size=0,
+                 server_selection_timeout_ms=3000, heartbeat_frequency_ms=10000,
+                 reconnect_after=60, event_listeners=None):
+        self.uri = uri
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.heartbeat_frequency_ms = heartbeat_frequency_ms
+        # Délai (s) d'indisponibilité après lequel le client est recréé
+        self.reconnect_after = reconnect_after
+        # Écouteurs pymongo (commandes, pool) : métriques Prometheus
+        self.event_listeners = list(event_listeners or [])
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._unhealthy_since = None
+
+    def _create_client(self):
+        return pymongo.MongoClient(
+            self.uri,
+            maxPoolSize=self.max_pool_size,
+            minPoolSize=self.min_pool_size,
+            serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+            heartbeatFrequencyMS=self.heartbeat_frequency_ms,
+            event_listeners=self.event_listeners,
+            connect=True
+        )
+
+    @property
+    def client(self):
+        """Client partagé, créé à la première utilisation (et après un fork)"""
+        client = self._client
+        if client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    # Le client hérité du processus parent est abandonné, pas fermé :
+                    # ses sockets et threads de monitoring appartiennent au parent
+                    self._client = self._create_client()
+                    self._pid = os.getpid()
+                client = self._client
+        return client
+
+    def is_healthy(self):
+        """État du serveur d'après le dernier heartbeat (sans aller-retour réseau)"""
+        try:
+            return self.client.topology_description.has_readable_server()
+        except Exception:
+            return False
+
+    def ping(self):
+        """Vérification explicite avec aller-retour réseau (démarrage, diagnostic)"""
+        try:
+            self.client.admin.command('ping')
+            return True
+        except Exception as e:
+            print(f"Erreur ping MongoDB: {e}")
+            return False
+
+    def get_client(self):
+        """Retourner le client partagé s'il est disponible, sinon None"""
+        if self.is_healthy():
+            self._unhealthy_since = None
+            return self.client
+
+        now = time.monotonic()
+        if self._unhealthy_since is None:
+            self._unhealthy_since = now
+            # Le monitoring n'a peut-être pas encore découvert le serveur
+            if self.ping():
+                self._unhealthy_since = None
+                return self.client
+        elif now - self._unhealthy_since >= self.reconnect_after:
+            print("MongoDB indisponible depuis trop longtemps, reconnexion...")
+            self.reconnect()
+            self._unhealthy_since = now
+        return None
+
+    def reconnect(self):
+        """Fermer le client courant ; le prochain accès en recrée un"""
+        with self._lock:
+            old_client, self._client = self._client, None
+        if old_client is not None:
+            try:
+                old_client.close()
+            except Exception as e:
+                print(f"Erreur fermeture client MongoDB: {e}")
+
+    def close(self):
+        self.reconnect()
+
+    def pool_options(self):
+        return {
+            'max_pool_size': self.max_pool_size,
+            'min_pool_size': self.min_pool_size,
+            'heartbeat_frequency_ms': self.heartbeat_frequency_ms
+        }
+
+
+class AsyncMongoClientManager:
+    """Client motor partagé par les coroutines d'une boucle d'événements"""
+
+    def __init__(self, uri, max_pool_size=100, server_selection_timeout_ms=3000,
+                 heartbeat_frequency_ms=10000, event_listeners=None):
+        self.uri = uri
+        self.max_pool_size = max_pool_size
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.heartbeat_frequency_ms = heartbeat_frequency_ms
+        self.event_listeners = list(event_listeners or [])
+        self._client = None
+        self._loop = None
+        self._pid = None
+        self._unhealthy_since = None
+
+    @property
+    def client(self):
+        """Client de la boucle courante, créé à la première utilisation"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._pid != os.getpid():
+            self._client = AsyncIOMotorClient(
+                self.uri,
+                maxPoolSize=self.max_pool_size,
+                serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                heartbeatFrequencyMS=self.heartbeat_frequency_ms,
+                event_listeners=self.event_listeners,
+                io_loop=loop
+            )
+            self._loop, self._pid = loop, os.getpid()
+        return self._client
+
+    async def get_client(self):
+        """Client s'il est disponible, sinon None (un seul ping par indisponibilité)
+
+        Comme pour le client synchrone, l'état vient du heartbeat : tant que
+        le serveur reste injoignable, les requêtes ne l'attendent pas.
+        """
+        client = self.client
+        if client.delegate.topology_description.has_readable_server():
+            self._unhealthy_since = None
+            return client
+        if self._unhealthy_since is None:
+            self._unhealthy_since = time.monotonic()
+            try:
+                await client.admin.command('ping')
+                self._unhealthy_since = None
+                return client
+            except Exception as e:
+                print(f"Erreur ping MongoDB: {e}")
+        return None
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def manager_from_env(default_uri, event_listeners=None):
+    """Construire le gestionnaire à partir des variables d'environnement"""
+    return MongoClientManager(
+        os.getenv('MONGODB_URI', default_uri),
+        max_pool_size=int(os.getenv('MONGODB_MAX_POOL_SIZE', '50')),
+        min_pool_size=int(os.getenv('MONGODB_MIN_POOL_SIZE', '0')),
+        server_selection_timeout_ms=int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '3000')),
+        heartbeat_frequency_ms=int(os.getenv('MONGODB_HEARTBEAT_FREQUENCY_MS', '10000')),
+        reconnect_after=int(os.getenv('MONGODB_RECONNECT_AFTER', '60')),
+        event_listeners=event_listeners
+    )
+
+
+def async_manager_from_env(default_uri, event_listeners=None):
+    """Gestionnaire du client motor, mêmes variables d'environnement"""
+    return AsyncMongoClientManager(
+        os.getenv('MONGODB_URI', default_uri),
+        max_pool_size=int(os.getenv('MONGODB_ASYNC_MAX_POOL_SIZE', '100')),
+        server_selection_timeout_ms=int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '3000')),
+        heartbeat_frequency_ms=int(os.getenv('MONGODB_HEARTBEAT_FREQUENCY_MS', '10000')),
+        event_listeners=event_listeners
+    )
@@ -0,0 +1,65 @@
+"""
+Lecteur Parquet des résultats Spark pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les analyses Spark sont écrites en Parquet (un fichier compacté par
+analyse). La lecture ne récupère que les colonnes demandées, applique les
+filtres sur les statistiques des row groups (predicate pushdown) et reste
+en format colonnaire (pyarrow.Table) : les dictionnaires Python ne sont
+construits qu'au moment de la sérialisation JSON (to_records).
+"""
+
+import pyarrow.parquet as pq
+
+from hdfs_client import READ_AHEAD
+
+PARQUET_OUTPUTS = {
+    'product-analysis': '/spark-output/product-analysis.parquet',
+    'city-analysis': '/spark-output/city-analysis.parquet',
+    'customer-analysis': '/spark-output/customer-analysis.parquet'
+}
+
+
+def read_table(source, columns=None, filters=None, sort_by=None, limit=None):
+    """Lire une table Parquet (chemin ou fichier) avec projection et filtres
+
+    filters suit la syntaxe pyarrow, par ex. [('total_revenue', '>', 1000)].
+    sort_by est une liste de (colonne, 'ascending'|'descending').
+    """
+    table = pq.read_table(source, columns=columns, filters=filters)
+    if sort_by:
+        table = table.sort_by(sort_by)
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table
+
+
+def to_records(table):
+    """Conversion en liste de dictionnaires, à la frontière JSON uniquement"""
+    return table.to_pylist()
+
+
+class ParquetAnalysisReader:
+    """Lecture des sorties Parquet Spark via WebHDFS (lectures par plages,
+    avec lecture anticipée de buffer_size octets)"""
+
+    def __init__(self, hdfs_client, buffer_size=READ_AHEAD):
+        self.hdfs_client = hdfs_client
+        self.buffer_size = buffer_size
+
+    def find_file(self, analysis_type):
+        directory = PARQUET_OUTPUTS.get(analysis_type)
+        if directory is None:
+            return None
+        files = [path for path in self.hdfs_client.list_part_files(directory)
+                 if path.endswith('.parquet')]
+        return files[0] if files else None
+
+    def read(self, analysis_type, columns=None, filters=None, sort_by=None, limit=None):
+        """Table de l'analyse (None si aucune sortie Parquet n'existe)"""
+        path = self.find_file(analysis_type)
+        if path is None:
+            return None
+        with self.hdfs_client.open_file(path, self.buffer_size) as source:
+            return read_table(source, columns=columns, filters=filters,
+                              sort_by=sort_by, limit=limit)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Partitionnement des ventes par date dans HDFS
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les ventes sont rangées par jour de vente :
+    /data/sales.csv/year=2024/month=01/day=15/part-00000.csv
+
+Cette disposition (style Hive) est reconnue par Spark, qui en déduit les
+colonnes year, month et day et ne lit que les partitions retenues par un
+filtre de dates. Les ventes sans jour lisible (date absente ou invalide)
+sont rangées dans la partition nulle de Hive (UNKNOWN_PARTITION) : Spark
+les lit avec year/month/day à null, aucune période ne les retient. Pig
+ne connaît pas les partitions : on lui passe la liste des répertoires de
+jours existants sous forme de glob.
+
+Usage (dans le conteneur web-app) :
+    python partitions.py /data/sales.csv --start 2024-01-01 --end 2024-01-31
+"""
+
+import argparse
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+
+# Valeur de partition nulle reconnue par Spark (et Hive)
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+UNKNOWN_PARTITION = f"year={NULL_PARTITION}/month={NULL_PARTITION}/day={NULL_PARTITION}"
+
+# Préfixe 'YYYY-MM-DD' d'une date de vente lisible ; les jours absents du
+# calendrier (30 février...) ne peuvent tomber que dans SUSPECT_DAY_PATTERN
+DAY_PATTERN = re.compile(r'^[0-9]{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])')
+SUSPECT_DAY_PATTERN = re.compile(r'^[0-9]{4}-(02-(29|3[01])|(0[469]|11)-31)')
+
+
+def parse_date(value):
+    """Date 'YYYY-MM-DD' (ValueError si le format est invalide)"""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def sale_date(value):
+    """Jour d'une vente (chaîne 'YYYY-MM-DD' ou datetime), None si illisible"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return parse_date(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def date_range_filter(start=None, end=None, field='date'):
+    """Filtre MongoDB des ventes entre deux jours inclus (dates 'YYYY-MM-DD')
+
+    La borne haute est exclusive au lendemain pour inclure les dates
+    horodatées du dernier jour ; le filtre s'appuie sur l'index sales.date.
+    """
+    bounds = {}
+    if start:
+        bounds['$gte'] = start.isoformat()
+    if end:
+        bounds['$lt'] = (end + timedelta(days=1)).isoformat()
+    return {field: bounds} if bounds else {}
+
+
+def partition_path(day):
+    return f"year={day.year:04d}/month={day.month:02d}/day={day.day:02d}"
+
+
+def _partition_value(name, key):
+    """Valeur entière d'un répertoire 'key=value' (None sinon)"""
+    prefix = f"{key}="
+    if not name.startswith(prefix):
+        return None
+    try:
+        return int(name[len(prefix):])
+    except ValueError:
+        return None
+
+
+def _subdirectories(hdfs, path, key):
+    for status in hdfs.list_status(path) or []:
+        value = _partition_value(status['pathSuffix'], key)
+        if status['type'] == 'DIRECTORY' and value is not None:
+            yield value
+
+
+def list_partitions(hdfs, base, start=None, end=None):
+    """Jours partitionnés existants entre start et end (inclus), triés
+
+    Les années et mois hors de l'intervalle ne sont pas listés.
+    """
+    base = base.rstrip('/')
+    days = []
+    for year in sorted(_subdirectories(hdfs, base, 'year')):
+        if (start and year < start.year) or (end and year > end.year):
+            continue
+        for month in sorted(_subdirectories(hdfs, f"{base}/year={year:04d}", 'month')):
+            if (start and (year, month) < (start.year, start.month)) or \
+                    (end and (year, month) > (end.year, end.month)):
+                continue
+            month_path = f"{base}/year={year:04d}/month={month:02d}"
+            for day_number in sorted(_subdirectories(hdfs, month_path, 'day')):
+                try:
+                    day = date(year, month, day_number)
+                except ValueError:
+                    continue
+                if (start and day < start) or (end and day > end):
+                    continue
+                days.append(day)
+    return days
+
+
+def input_glob(base, days):
+    """Glob Hadoop désignant exactement les répertoires des jours donnés"""
+    paths = ','.join(partition_path(day) for day in days)
+    return f"{base.rstrip('/')}/{{{paths}}}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Glob des partitions de dates pour Pig")
+    parser.add_argument('base', help="répertoire HDFS partitionné, ex. /data/sales.csv")
+    parser.add_argument('--start', type=parse_date)
+    parser.add_argument('--end', type=parse_date)
+    args = parser.parse_args(argv)
+
+    from hdfs_client import client_from_env
+
+    hdfs = client_from_env()
+    try:
+        days = list_partitions(hdfs, args.base, args.start, args.end)
+    finally:
+        hdfs.close()
+    if not days:
+        print(f"Aucune partition dans {args.base} pour cette période", file=sys.stderr)
+        sys.exit(1)
+    print(input_glob(args.base, days))
+
+
+if __name__ == "__main__":
+    main()
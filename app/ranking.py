@@ -0,0 +1,36 @@
+"""
+Classements pré-calculés pour l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+Un classement est trié une seule fois, à sa construction (mise en cache
+avec le résultat d'analyse), puis sert les top-K par tranche et les
+recherches par identifiant via un dictionnaire : aucune requête ne trie ni
+ne parcourt l'ensemble des résultats.
+"""
+
+
+class Ranking:
+    """Résultats triés par valeur décroissante, indexés par identifiant"""
+
+    def __init__(self, records, value_field, id_field):
+        self.value_field = value_field
+        self.id_field = id_field
+        # Tri stable : à valeur égale, l'ordre de la source est conservé
+        self.records = sorted(records, key=lambda record: record.get(value_field) or 0, reverse=True)
+        self._positions = {record.get(id_field): position
+                           for position, record in enumerate(self.records)}
+
+    def __len__(self):
+        return len(self.records)
+
+    def top(self, k):
+        """Les k premiers, avec leur rang (1 = montant le plus élevé)"""
+        return [dict(record, rank=position + 1)
+                for position, record in enumerate(self.records[:k])]
+
+    def get(self, identifier):
+        """Entrée d'un identifiant avec son rang, None s'il n'est pas classé"""
+        position = self._positions.get(identifier)
+        if position is None:
+            return None
+        return dict(self.records[position], rank=position + 1)
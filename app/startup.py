@@ -0,0 +1,76 @@
+"""
+Vérification de démarrage de l'application Web
+Projet Big Data - Traitement Distribué 2024-2025
+
+L'application sert les requêtes dès son lancement ; MongoDB est attendu en
+tâche de fond (avec un délai croissant entre les tentatives) puis les index
+sont créés. /readyz reflète cet état pour l'orchestrateur, au lieu de
+bloquer le démarrage du serveur.
+"""
+
+import threading
+import time
+
+from indexes import ensure_indexes
+
+
+class StartupCheck:
+    """Attente non bloquante de MongoDB puis création des index"""
+
+    def __init__(self, mongo_manager, initial_delay=1, max_delay=30):
+        self.mongo_manager = mongo_manager
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.mongodb_ready = False
+        self.indexes = None
+        self.attempts = 0
+        self.started_at = time.monotonic()
+        self.ready_after_s = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.mongodb_ready and self.indexes is not None
+
+    def check(self):
+        """Une tentative : ping MongoDB puis création des index (True si prêt)"""
+        self.attempts += 1
+        if not self.mongo_manager.ping():
+            return False
+        self.mongodb_ready = True
+        self.indexes = ensure_indexes(self.mongo_manager.client.bigdata)
+        self.ready_after_s = round(time.monotonic() - self.started_at, 1)
+        print(f"✅ MongoDB est prêt ({self.attempts} tentatives, {self.ready_after_s} s)")
+        return True
+
+    def _run(self):
+        delay = self.initial_delay
+        while not self._stop.is_set():
+            try:
+                if self.check():
+                    return
+            except Exception as e:
+                print(f"Erreur vérification de démarrage: {e}")
+            print(f"⏳ Attente de MongoDB... (tentative {self.attempts}, prochaine dans {delay} s)")
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.max_delay)
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'mongodb': self.mongodb_ready,
+            'indexes': self.indexes,
+            'attempts': self.attempts,
+            'ready_after_s': self.ready_after_s,
+            'uptime_s': round(time.monotonic() - self.started_at, 1)
+        }
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='startup-check', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,135 @@
+"""
+Tendances des ventes à partir des cubes pré-agrégés
+Projet Big Data - Traitement Distribué 2024-2025
+
+Le job Spark (mongodb_reader.py) maintient deux cubes dans MongoDB :
+rollup_daily (produit × ville × jour) et rollup_monthly (produit × ville ×
+mois), mis à jour pour les seuls jours touchés en mode incrémental. Une
+série sur une plage de dates fusionne des lignes de ces cubes au lieu de
+parcourir les ventes : les mois entièrement couverts sont lus dans le cube
+mensuel, les jours des mois partiels aux bornes dans le cube quotidien.
+"""
+
+from datetime import date, timedelta
+
+GRANULARITIES = ('day', 'month')
+DIMENSIONS = ('product', 'city')
+MEASURES = ('sales', 'quantity', 'revenue')
+
+# Au-delà de cette durée (en jours), la série est mensuelle par défaut
+DAY_SERIES_MAX_DAYS = 92
+
+
+def next_month(day):
+    """Premier jour du mois suivant celui de day"""
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def default_granularity(start=None, end=None):
+    if start is None or end is None:
+        return 'month'
+    return 'day' if (end - start).days < DAY_SERIES_MAX_DAYS else 'month'
+
+
+def split_range(start=None, end=None):
+    """Découper [start, end] (bornes incluses, None = ouverte) entre les cubes
+
+    Retourne (plages de jours, plage de mois) : les plages de jours (début,
+    fin) couvrent les mois partiels aux bornes ; la plage de mois ('YYYY-MM'
+    ou None si ouverte, bornes incluses) couvre les mois complets, None s'il
+    n'y en a aucun.
+    """
+    # Premier mois complet et premier mois (exclu) qui ne l'est plus
+    first = next_month(start - timedelta(days=1)) if start else None
+    stop = (end + timedelta(days=1)).replace(day=1) if end else None
+    if first and stop and first >= stop:
+        return [(start, end)], None
+
+    days = []
+    if start and start < first:
+        days.append((start, first - timedelta(days=1)))
+    if end and stop <= end:
+        days.append((stop, end))
+    months = (first.strftime('%Y-%m') if first else None,
+              (stop - timedelta(days=1)).strftime('%Y-%m') if stop else None)
+    return days, months
+
+
+def _bounds(low, high):
+    bounds = {}
+    if low is not None:
+        bounds['$gte'] = low
+    if high is not None:
+        bounds['$lte'] = high
+    return bounds
+
+
+def rollup_pipeline(match, period, group_by=None):
+    """Somme des mesures par période (et par dimension) sur les lignes retenues"""
+    key = {'period': period}
+    if group_by:
+        key[group_by] = f"${group_by}"
+    return [
+        {'$match': match},
+        {'$group': dict({'_id': key}, **{m: {'$sum': f"${m}"} for m in MEASURES})}
+    ]
+
+
+def trend_queries(start=None, end=None, granularity='day', group_by=None, filters=None):
+    """Agrégations à exécuter : [(collection, pipeline), ...]
+
+    Une série journalière ne lit que le cube quotidien ; une série
+    mensuelle combine les mois complets (cube mensuel) et les jours des
+    mois partiels (cube quotidien, regroupés par mois).
+    """
+    filters = dict(filters or {})
+    if granularity == 'day':
+        match = dict(filters)
+        bounds = _bounds(start and start.isoformat(), end and end.isoformat())
+        if bounds:
+            match['date'] = bounds
+        return [('rollup_daily', rollup_pipeline(match, '$date', group_by))]
+
+    days, months = split_range(start, end)
+    queries = []
+    if days:
+        match = dict(filters, **{'$or': [{'date': _bounds(a.isoformat(), b.isoformat())}
+                                         for a, b in days]})
+        queries.append(('rollup_daily', rollup_pipeline(
+            match, {'$substrBytes': ['$date', 0, 7]}, group_by
+        )))
+    if months is not None:
+        match = dict(filters)
+        bounds = _bounds(*months)
+        if bounds:
+            match['month'] = bounds
+        queries.append(('rollup_monthly', rollup_pipeline(match, '$month', group_by)))
+    return queries
+
+
+def merge_rows(rows, group_by=None):
+    """Fusionner les lignes des cubes par (période, dimension), triées par
+    période puis chiffre d'affaires décroissant"""
+    merged = {}
+    for row in rows:
+        key = (row['_id'].get('period'), row['_id'].get(group_by) if group_by else None)
+        entry = merged.get(key)
+        if entry is None:
+            entry = merged[key] = {'period': key[0]}
+            if group_by:
+                entry[group_by] = key[1]
+            entry.update({m: 0 for m in MEASURES})
+        for m in MEASURES:
+            entry[m] += row.get(m) or 0
+    series = sorted(merged.values(), key=lambda e: (e['period'] or '', -(e['revenue'] or 0)))
+    for entry in series:
+        entry['revenue'] = round(entry['revenue'], 2)
+    return series
+
+
+async def query_trends(db, start=None, end=None, granularity='day', group_by=None, filters=None):
+    """Série de tendances depuis les cubes (base motor)"""
+    rows = []
+    for collection, pipeline in trend_queries(start, end, granularity, group_by, filters):
+        rows += await db[collection].aggregate(pipeline).to_list(None)
+    return merge_rows(rows, group_by)
@@ -25,6 +25,7 @@ db.createCollection("city_analysis");
 db.sales.createIndex({ "customer_id": 1 });
 db.sales.createIndex({ "product": 1 });
 db.sales.createIndex({ "date": 1 });
+db.customers.createIndex({ "id": 1 });
 db.customers.createIndex({ "city": 1 });
 db.customers.createIndex({ "email": 1 }, { unique: true });
 
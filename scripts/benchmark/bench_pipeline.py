@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Benchmark de bout en bout : endpoints du dashboard, agrégations MongoDB, lecture HDFS
+Projet Big Data - Traitement Distribué 2024-2025
+
+Usage:
+    python scripts/benchmark/bench_pipeline.py [--sales 100000] [--repeat 5]
+    python scripts/benchmark/bench_pipeline.py --sales 10000000 \
+        --mongodb-uri 'mongodb://localhost:27017/?directConnection=true'
+
+Les données viennent de generate_data.py (même graine, même asymétrie).
+Sans --mongodb-uri, MongoDB est simulé par mongomock (pip install mongomock
+mongomock-motor) : les pipelines d'agrégation du dashboard ($round,
+$lookup avec sous-pipeline) n'y sont pas pris en charge, le niveau
+« aggregation » n'est alors mesuré qu'avec un vrai mongod. ATTENTION : avec
+--mongodb-uri, les collections de la base bigdata sont remplacées.
+WebHDFS est simulé en mémoire (stub_hdfs.py).
+
+Mesures :
+    endpoints : /api/* pour chaque niveau de source (résultats Spark dans
+                MongoDB, sorties CSV dans HDFS, moteur en mémoire, agrégation
+                directe), cache vidé avant chaque appel (froid) ou conservé
+                (chaud) ; analyses sur 30 jours pour le moteur et l'agrégation
+    pipelines : agrégations produits, villes et produits sur un mois
+    parsing   : parse_rows en mémoire et lecture HDFS complète (liste + flux)
+
+Chaque exécution est ajoutée à --results (une ligne JSON) et comparée à
+la précédente exécution de même taille et de même moteur.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, '..', '..', 'app'))
+
+from csv_parser import CUSTOMER_SCHEMA, PRODUCT_SCHEMA, SPARK_CITY_SCHEMA, RowParser, parse_rows
+from generate_data import Catalog
+from indexes import ensure_indexes
+from partitions import parse_date
+from stub_hdfs import StubHDFS
+
+TIERS = ['mongodb', 'hdfs', 'engine', 'aggregation']
+ENDPOINTS = ['/api/product-analysis', '/api/city-analysis', '/api/dashboard']
+# Analyses d'une période : toujours recalculées (moteur en mémoire ou agrégation)
+PERIOD_TIERS = ['engine', 'aggregation']
+
+# Sorties Spark (CSV avec en-tête) déposées dans le WebHDFS simulé
+HDFS_OUTPUTS = {
+    'product-analysis': ('/spark-output/product-analysis', PRODUCT_SCHEMA),
+    'city-analysis': ('/spark-output/city-analysis', SPARK_CITY_SCHEMA),
+    'customer-analysis': ('/spark-output/customer-analysis', CUSTOMER_SCHEMA),
+}
+
+# Collections où Spark sauvegarde ses résultats
+RESULT_COLLECTIONS = {'product-analysis': 'product_analysis', 'city-analysis': 'city_analysis'}
+
+
+def load_data(db, catalog, args):
+    """Insérer ventes et clients, et calculer au passage les résultats attendus de Spark"""
+    db.sales.drop()
+    db.customers.drop()
+    customers = list(catalog.customers(args.seed))
+    db.customers.insert_many(customers)
+    city_of = {c['id']: c['city'] for c in customers}
+
+    products = defaultdict(lambda: [0, 0, 0.0, 0.0])
+    cities = defaultdict(lambda: [0, 0.0, set()])
+    buyers = defaultdict(lambda: [0, 0.0])
+    for batch in catalog.sales_batches(args.sales, args.start, args.days, seed=args.seed):
+        db.sales.insert_many(batch, ordered=False)
+        for sale in batch:
+            amount = sale['quantity'] * sale['price']
+            product = products[sale['product']]
+            product[0] += 1
+            product[1] += sale['quantity']
+            product[2] += sale['price']
+            product[3] += amount
+            city = cities[city_of[sale['customer_id']]]
+            city[0] += 1
+            city[1] += amount
+            city[2].add(sale['customer_id'])
+            buyer = buyers[sale['customer_id']]
+            buyer[0] += 1
+            buyer[1] += amount
+
+    return {
+        'product-analysis': [
+            {'product': name, 'total_sales': s, 'total_quantity': q,
+             'avg_price': round(p / s, 2), 'total_revenue': round(r, 2)}
+            for name, (s, q, p, r) in products.items()
+        ],
+        'city-analysis': [
+            {'city': name, 'total_transactions': t, 'city_revenue': round(r, 2),
+             'unique_customers': len(ids)}
+            for name, (t, r, ids) in cities.items()
+        ],
+        'customer-analysis': [
+            {'customer_id': customer_id, 'purchase_count': n, 'customer_total': round(total, 2)}
+            for customer_id, (n, total) in buyers.items()
+        ],
+    }
+
+
+def to_csv(records, schema):
+    """CSV Spark (en-tête + lignes) d'une liste de résultats"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([field.name for field in schema])
+    for record in records:
+        writer.writerow([record[field.name] for field in schema])
+    return buffer.getvalue().encode('utf-8')
+
+
+def stats(samples):
+    """Durées en ms : minimum, médiane et 95e centile"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {'min_ms': round(ordered[0] * 1000, 2),
+            'median_ms': round(statistics.median(ordered) * 1000, 2),
+            'p95_ms': round(p95 * 1000, 2)}
+
+
+def measure(func, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return stats(samples), result
+
+
+async def measure_async(func, repeat, before=None):
+    samples, result = [], None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        result = await func()
+        samples.append(time.perf_counter() - start)
+    return stats(samples), result
+
+
+class Bench:
+    """Environnement de mesure : application, MongoDB (réel ou mongomock), WebHDFS simulé"""
+
+    def __init__(self, args):
+        self.args = args
+        self.results = []
+        self.hdfs = StubHDFS().start()
+        os.environ['WEBHDFS_URL'] = self.hdfs.url
+        # Sondes de santé non rafraîchies pendant les mesures
+        os.environ.setdefault('HEALTH_PROBE_INTERVAL', '3600')
+        os.environ.setdefault('HEALTH_PROBE_TIMEOUT', '0.2')
+        if args.mongodb_uri:
+            os.environ['MONGODB_URI'] = args.mongodb_uri
+
+        import main as dashboard
+        self.app = dashboard
+        if args.mongodb_uri:
+            import pymongo
+            self.engine = 'mongod'
+            self.client = pymongo.MongoClient(args.mongodb_uri)
+        else:
+            try:
+                import mongomock
+                import mongomock_motor
+            except ImportError:
+                sys.exit("mongomock et mongomock-motor sont requis sans --mongodb-uri "
+                         "(pip install mongomock mongomock-motor)")
+            self.engine = 'mongomock'
+            self.client = mongomock.MongoClient()
+            async_client = mongomock_motor.AsyncMongoMockClient(mock_mongo_client=self.client)
+
+            async def get_async_client():
+                return async_client
+            dashboard.async_mongo.get_client = get_async_client
+            dashboard.mongo_manager._create_client = lambda: self.client
+        self.db = self.client.bigdata
+
+    def record(self, group, name, timing, tier=None, **extra):
+        entry = dict(group=group, name=name, tier=tier, **timing, **extra)
+        self.results.append(entry)
+        label = f"{name} [{tier}]" if tier else name
+        details = ' '.join(f"{k}={v}" for k, v in extra.items())
+        print(f"  {label:<52} médiane {timing['median_ms']:>9.2f} ms  "
+              f"p95 {timing['p95_ms']:>9.2f} ms  {details}")
+
+    def skip(self, group, name, reason, tier=None):
+        self.results.append({'group': group, 'name': name, 'tier': tier, 'skipped': reason})
+        label = f"{name} [{tier}]" if tier else name
+        print(f"  {label:<52} ignoré : {reason}")
+
+    def prepare_tier(self, tier):
+        """Ne laisser disponible que la source du niveau mesuré"""
+        for analysis_type, collection in RESULT_COLLECTIONS.items():
+            self.db[collection].drop()
+            if tier == 'mongodb':
+                self.db[collection].insert_many([dict(r) for r in self.expected[analysis_type]])
+        for analysis_type, (directory, schema) in HDFS_OUTPUTS.items():
+            self.hdfs.remove(directory)
+            if tier == 'hdfs' or analysis_type == 'customer-analysis':
+                self.hdfs.put(f"{directory}/part-00000-bench.csv", to_csv(self.expected[analysis_type], schema))
+        self.app.ANALYTICS_ENGINE_ENABLED = tier == 'engine'
+        if tier == 'engine' and not self.app.analytics_engine.ready:
+            timing, _ = measure(self.app.analytics_engine.refresh, 1)
+            self.record('engine', 'chargement du moteur en mémoire', timing,
+                        rows=self.app.analytics_engine.stats()['sales'])
+        self.app.result_cache.invalidate()
+
+    def run_pipelines(self):
+        print("\nPipelines d'agrégation (MongoDB)")
+        last_day = self.args.start + timedelta(days=self.args.days - 1)
+        month = (max(self.args.start, last_day - timedelta(days=29)), last_day)
+        pipelines = [
+            ('produits', self.app.product_aggregation_pipeline()),
+            ('villes ($lookup)', self.app.city_aggregation_pipeline()),
+            ('produits sur 30 jours', self.app.product_aggregation_pipeline(month)),
+        ]
+        for name, pipeline in pipelines:
+            try:
+                timing, rows = measure(lambda: list(self.db.sales.aggregate(pipeline)), self.args.repeat)
+            except Exception as e:
+                self.skip('pipelines', name, f"{type(e).__name__}: {str(e)[:80]}")
+                continue
+            self.record('pipelines', name, timing, rows=len(rows))
+
+    async def run_parsing(self):
+        print("\nDécodage des sorties Spark/Pig")
+        directory, schema = HDFS_OUTPUTS['customer-analysis']
+        lines = to_csv(self.expected['customer-analysis'], schema).decode('utf-8').splitlines()
+        timing, rows = measure(lambda: list(parse_rows(lines, schema)), self.args.repeat)
+        self.record('parsing', 'parse_rows clients (mémoire)', timing, rows=len(rows))
+
+        async def hdfs_read():
+            parser = RowParser(schema)
+            return [row async for lines in self.app.async_hdfs.read_part_lines(directory)
+                    for row in parser.feed(lines)]
+        timing, rows = await measure_async(hdfs_read, self.args.repeat)
+        self.record('parsing', 'WebHDFS liste + flux + parse_rows clients', timing, rows=len(rows))
+
+    async def run_endpoints(self):
+        client = self.app.create_app(start_background=False).test_client()
+        headers = {'Accept-Encoding': 'gzip'}
+        # Premier instantané des sondes de santé hors mesure
+        await asyncio.to_thread(self.app.health_monitor.snapshot)
+        last_day = self.args.start + timedelta(days=self.args.days - 1)
+        period = f"?start={max(self.args.start, last_day - timedelta(days=29))}&end={last_day}"
+        for tier in TIERS:
+            print(f"\nEndpoints, source {tier}")
+            paths = list(ENDPOINTS)
+            if tier in PERIOD_TIERS:
+                paths += [f"/api/product-analysis{period}", f"/api/city-analysis{period}"]
+            if tier == 'aggregation' and self.engine == 'mongomock':
+                for path in paths:
+                    self.skip('endpoints', path, "pipelines non pris en charge par mongomock", tier)
+                continue
+            self.prepare_tier(tier)
+            for path in paths:
+                async def call():
+                    return await client.get(path, headers=headers)
+                cold, response = await measure_async(call, self.args.repeat,
+                                                     before=self.app.result_cache.invalidate)
+                body = await response.get_data()
+                self.record('endpoints', path, cold, tier, cache='froid',
+                            status=response.status_code, bytes=len(body))
+                warm, response = await measure_async(call, self.args.repeat)
+                self.record('endpoints', path, warm, tier, cache='chaud', status=response.status_code)
+        await self.app.close_async_clients()
+
+    def run(self):
+        args = self.args
+        catalog = Catalog(args.products, args.cities, args.customers, args.skew, args.seed)
+        print(f"Chargement de {args.sales} ventes, {args.customers} clients ({self.engine})...")
+        started = time.perf_counter()
+        self.expected = load_data(self.db, catalog, args)
+        if self.engine == 'mongod':
+            ensure_indexes(self.db)
+        print(f"Données prêtes en {time.perf_counter() - started:.1f} s")
+        if self.engine == 'mongomock':
+            print("ATTENTION : mongomock ne prend pas en charge les pipelines du dashboard ; "
+                  "le niveau aggregation n'est pas mesuré (--mongodb-uri pour un vrai mongod)")
+
+        self.run_pipelines()
+        self.prepare_tier('hdfs')
+        asyncio.run(self.run_parsing())
+        asyncio.run(self.run_endpoints())
+        self.hdfs.stop()
+        self.client.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path, params, engine):
+    """Dernière exécution enregistrée avec les mêmes paramètres et le même moteur"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            run = json.loads(line)
+            if run.get('params') == params and run.get('engine') == engine:
+                previous = run
+    return previous
+
+
+def compare(results, previous):
+    def key(entry):
+        return entry['group'], entry['name'], entry.get('tier'), entry.get('cache')
+    before = {key(e): e for e in previous['results'] if 'median_ms' in e}
+    print(f"\nÉvolution depuis {previous['timestamp']} ({previous.get('revision') or '?'})")
+    for entry in results:
+        old = before.get(key(entry))
+        if old and 'median_ms' in entry and old['median_ms']:
+            change = (entry['median_ms'] - old['median_ms']) / old['median_ms'] * 100
+            label = ' '.join(str(p) for p in key(entry)[1:] if p)
+            print(f"  {label:<60} {old['median_ms']:>9.2f} -> {entry['median_ms']:>9.2f} ms ({change:+.0f} %)")
+
+
+def report_skipped(results):
+    """Récapituler les mesures ignorées, par groupe, niveau et raison"""
+    skipped = defaultdict(int)
+    for entry in results:
+        if 'skipped' in entry:
+            skipped[entry['group'], entry.get('tier'), entry['skipped']] += 1
+    if not skipped:
+        return
+    print(f"\nMesures ignorées ({sum(skipped.values())}) :")
+    for (group, tier, reason), count in sorted(skipped.items(), key=lambda item: str(item[0])):
+        label = f"{group} [{tier}]" if tier else group
+        print(f"  {label:<30} {count:>3} × {reason}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sales', type=int, default=100000)
+    parser.add_argument('--customers', type=int, default=None,
+                        help="Nombre de clients (défaut : ventes / 20, au moins 100)")
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--cities', type=int, default=50)
+    parser.add_argument('--skew', type=float, default=1.1)
+    parser.add_argument('--start', type=parse_date, default=parse_date('2024-01-01'))
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--mongodb-uri', help="mongod local (sinon mongomock)")
+    parser.add_argument('--results', default=os.path.join(BENCHMARK_DIR, 'results', 'pipeline.jsonl'),
+                        help="Historique des mesures (JSON lines)")
+    args = parser.parse_args(argv)
+    if args.customers is None:
+        args.customers = max(100, args.sales // 20)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    bench = Bench(args)
+    bench.run()
+
+    params = {name: getattr(args, name) for name in
+              ('sales', 'customers', 'products', 'cities', 'skew', 'days', 'seed')}
+    previous = previous_run(args.results, params, bench.engine)
+    if previous:
+        compare(bench.results, previous)
+    report_skipped(bench.results)
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'engine': bench.engine,
+        'python': platform.python_version(),
+        'params': params,
+        'repeat': args.repeat,
+        'results': bench.results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    print(f"\nRésultats ajoutés à {args.results}")
+
+
+if __name__ == "__main__":
+    main()
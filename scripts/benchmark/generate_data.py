@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Générateur de données synthétiques : ventes et clients
+Projet Big Data - Traitement Distribué 2024-2025
+
+Usage:
+    python scripts/benchmark/generate_data.py --sales 1000000 --output /tmp/bigdata
+    python scripts/benchmark/generate_data.py --sales 1000000 --format csv --output /tmp/bigdata
+    python scripts/benchmark/generate_data.py --sales 1000000 \
+        --mongodb-uri 'mongodb://localhost:27017/bigdata'
+
+Mêmes champs que dockerfiles/mongodb/sample-data, de 10 000 à 100 millions
+de ventes. Produits, villes et clients suivent une loi de Zipf (--skew) :
+quelques produits, villes et clients concentrent l'essentiel des ventes,
+comme sur des données réelles. La génération est déterministe pour une
+graine donnée et se fait par lots (mémoire bornée par la taille du
+catalogue, pas par le nombre de ventes).
+
+Formats de sortie :
+    jsonl : sales.jsonl et customers.jsonl (mongoimport sans --jsonArray)
+    csv   : disposition HDFS de transfer.py, sans en-tête (lue par Pig et Spark)
+            sales.csv/year=YYYY/month=MM/day=DD/part-00000.csv
+            customers.csv/part-00000.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import unicodedata
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app'))
+
+from partitions import parse_date, partition_path
+from transfer import CSV_COLUMNS
+
+# Gammes de produits : (noms de base, prix minimal, prix maximal)
+PRODUCT_FAMILIES = [
+    (['iPhone 15', 'Samsung Galaxy S24', 'Google Pixel 8', 'Xiaomi 14'], 299, 1299),
+    (['Laptop Dell XPS', 'MacBook Pro', 'Lenovo ThinkPad', 'HP EliteBook'], 699, 2999),
+    (['iPad Air', 'Galaxy Tab S9', 'Surface Pro'], 349, 1499),
+    (['AirPods Pro', 'Sony WH-1000XM5', 'Bose QC45'], 79, 449),
+    (['Apple Watch', 'Garmin Forerunner', 'Fitbit Sense'], 149, 899),
+]
+
+BASE_CITIES = ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nice', 'Bordeaux', 'Strasbourg',
+               'Nantes', 'Montpellier', 'Lille', 'Rennes', 'Reims', 'Grenoble', 'Dijon']
+
+FIRST_NAMES = ['Alice', 'Bob', 'Claire', 'David', 'Emma', 'François', 'Gabrielle', 'Hugo',
+               'Inès', 'Julien', 'Karima', 'Louis', 'Manon', 'Nicolas', 'Océane', 'Paul']
+LAST_NAMES = ['Martin', 'Dupont', 'Moreau', 'Bernard', 'Petit', 'Durand', 'Leroy', 'Roux',
+              'Fournier', 'Girard', 'Lambert', 'Bonnet', 'Mercier', 'Blanc', 'Garnier']
+
+# Quantités : la plupart des ventes portent sur un seul article
+QUANTITIES = [1, 2, 3, 4, 5]
+QUANTITY_WEIGHTS = [60, 22, 10, 5, 3]
+
+
+def zipf_cum_weights(count, skew):
+    """Poids cumulés de Zipf (rang 1 le plus fréquent) pour random.choices"""
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+class Catalog:
+    """Produits, villes et clients tirés d'une graine, avec leur popularité"""
+
+    def __init__(self, products=100, cities=50, customers=10000, skew=1.1, seed=42):
+        rng = random.Random(seed)
+        self.skew = skew
+        self.products = []
+        for i in range(products):
+            names, low, high = PRODUCT_FAMILIES[i % len(PRODUCT_FAMILIES)]
+            name = names[(i // len(PRODUCT_FAMILIES)) % len(names)]
+            generation = i // (len(PRODUCT_FAMILIES) * len(names))
+            if generation:
+                name = f"{name} {generation + 1}"
+            self.products.append((name, round(rng.uniform(low, high), 2)))
+        # Ordre de popularité indépendant de l'ordre des gammes
+        rng.shuffle(self.products)
+
+        self.cities = [BASE_CITIES[i] if i < len(BASE_CITIES) else f"Ville {i + 1}"
+                       for i in range(cities)]
+        city_weights = zipf_cum_weights(cities, skew)
+        self.customer_cities = rng.choices(self.cities, cum_weights=city_weights, k=customers)
+        self.customer_ids = [f"c{i + 1:08d}" for i in range(customers)]
+        self.product_weights = zipf_cum_weights(products, skew)
+        self.customer_weights = zipf_cum_weights(customers, skew)
+        # Rang de popularité d'un client indépendant de son identifiant
+        self.customer_order = list(range(customers))
+        rng.shuffle(self.customer_order)
+
+    def customers(self, seed=42):
+        """Documents clients (même forme que customers.json)"""
+        rng = random.Random(seed)
+        for customer_id, city in zip(self.customer_ids, self.customer_cities):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            local = unicodedata.normalize('NFKD', f"{first}.{last}").encode('ascii', 'ignore').decode()
+            yield {
+                'id': customer_id,
+                'name': f"{first} {last}",
+                'email': f"{local.lower()}.{customer_id}@email.com",
+                'city': city,
+                'age': rng.randint(18, 80)
+            }
+
+    def sales_batches(self, count, start, days, batch_size=10000, seed=42):
+        """Lots de ventes (même forme que sales.json), identifiants croissants"""
+        rng = random.Random(seed)
+        day_values = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+        # Plus de ventes le week-end
+        day_weights = list(itertools.accumulate(
+            1.5 if (start + timedelta(days=offset)).weekday() >= 5 else 1.0 for offset in range(days)
+        ))
+        quantity_weights = list(itertools.accumulate(QUANTITY_WEIGHTS))
+
+        produced = 0
+        while produced < count:
+            size = min(batch_size, count - produced)
+            products = rng.choices(self.products, cum_weights=self.product_weights, k=size)
+            ranks = rng.choices(self.customer_order, cum_weights=self.customer_weights, k=size)
+            days_of_sale = rng.choices(day_values, cum_weights=day_weights, k=size)
+            quantities = rng.choices(QUANTITIES, cum_weights=quantity_weights, k=size)
+            batch = []
+            for i in range(size):
+                name, price = products[i]
+                batch.append({
+                    'id': f"s{produced + i + 1:010d}",
+                    'product': name,
+                    'quantity': quantities[i],
+                    # Remises et promotions : ±10 % autour du prix catalogue
+                    'price': round(price * rng.uniform(0.9, 1.1), 2),
+                    'date': days_of_sale[i],
+                    'customer_id': self.customer_ids[ranks[i]]
+                })
+            produced += size
+            yield batch
+
+
+def write_jsonl(path, batches):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for batch in batches:
+            f.writelines(json.dumps(doc, ensure_ascii=False) + '\n' for doc in batch)
+            count += len(batch)
+    return count
+
+
+def write_sales_csv(directory, batches):
+    """Un fichier part par jour de vente (partitions year=/month=/day=)"""
+    files = {}
+    count = 0
+    try:
+        for batch in batches:
+            for doc in batch:
+                day = doc['date']
+                if day not in files:
+                    path = os.path.join(directory, partition_path(parse_date(day)), 'part-00000.csv')
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    handle = open(path, 'w', newline='', encoding='utf-8')
+                    files[day] = (handle, csv.writer(handle, lineterminator='\n'))
+                files[day][1].writerow([doc[c] for c in CSV_COLUMNS['sales']])
+            count += len(batch)
+    finally:
+        for handle, _ in files.values():
+            handle.close()
+    return count
+
+
+def write_customers_csv(directory, customers):
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(os.path.join(directory, 'part-00000.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        for doc in customers:
+            writer.writerow([doc[c] for c in CSV_COLUMNS['customers']])
+            count += 1
+    return count
+
+
+def load_mongodb(db, catalog, args):
+    """Remplacer les collections sales et customers (insertions par lots)"""
+    db.sales.drop()
+    db.customers.drop()
+    customers = list(catalog.customers(args.seed))
+    for start in range(0, len(customers), args.batch_size):
+        db.customers.insert_many(customers[start:start + args.batch_size], ordered=False)
+    count = 0
+    for batch in catalog.sales_batches(args.sales, args.start, args.days, args.batch_size, args.seed):
+        db.sales.insert_many(batch, ordered=False)
+        count += len(batch)
+    return count, len(customers)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sales', type=int, default=100000, help="Nombre de ventes")
+    parser.add_argument('--customers', type=int, default=None,
+                        help="Nombre de clients (défaut : ventes / 20, au moins 100)")
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--cities', type=int, default=50)
+    parser.add_argument('--skew', type=float, default=1.1, help="Exposant de Zipf (0 = uniforme)")
+    parser.add_argument('--start', type=parse_date, default=date(2024, 1, 1), help="Premier jour de vente")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--output', help="Répertoire de sortie des fichiers")
+    parser.add_argument('--mongodb-uri', help="Insérer directement dans cette base MongoDB")
+    args = parser.parse_args(argv)
+    if args.customers is None:
+        args.customers = max(100, args.sales // 20)
+    if not args.output and not args.mongodb_uri:
+        parser.error("--output ou --mongodb-uri est requis")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    catalog = Catalog(args.products, args.cities, args.customers, args.skew, args.seed)
+    started = time.perf_counter()
+    print(f"Génération de {args.sales} ventes, {args.customers} clients, "
+          f"{args.products} produits, {args.cities} villes (graine {args.seed})...")
+
+    if args.mongodb_uri:
+        import pymongo
+        client = pymongo.MongoClient(args.mongodb_uri)
+        sales, customers = load_mongodb(client.get_default_database('bigdata'), catalog, args)
+        client.close()
+        print(f"MongoDB: {sales} ventes, {customers} clients insérés")
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        batches = catalog.sales_batches(args.sales, args.start, args.days, args.batch_size, args.seed)
+        if args.format == 'csv':
+            sales = write_sales_csv(os.path.join(args.output, 'sales.csv'), batches)
+            customers = write_customers_csv(os.path.join(args.output, 'customers.csv'),
+                                            catalog.customers(args.seed))
+        else:
+            sales = write_jsonl(os.path.join(args.output, 'sales.jsonl'), batches)
+            customers = write_jsonl(os.path.join(args.output, 'customers.jsonl'),
+                                    [list(catalog.customers(args.seed))])
+        print(f"Fichiers {args.format}: {sales} ventes, {customers} clients dans {args.output}")
+
+    elapsed = time.perf_counter() - started
+    print(f"Terminé en {elapsed:.1f} s ({args.sales / elapsed:,.0f} ventes/s)")
+
+
+if __name__ == "__main__":
+    main()
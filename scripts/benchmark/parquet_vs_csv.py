@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark : lecture des résultats d'analyse en CSV (parseur en flux) vs Parquet
+Projet Big Data - Traitement Distribué 2024-2025
+
+Fichiers locaux, puis lecture Parquet par WebHDFS (serveur stub_hdfs en
+mémoire) avec et sans lecture anticipée : durée et nombre de requêtes OPEN.
+
+Usage: python scripts/benchmark/parquet_vs_csv.py [--rows 1000000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from csv_parser import PRODUCT_SCHEMA, parse_rows
+from hdfs_client import READ_AHEAD, WebHDFSClient
+from parquet_reader import PARQUET_OUTPUTS, ParquetAnalysisReader, read_table, to_records
+from stub_hdfs import StubHDFS
+
+COLUMNS = [field.name for field in PRODUCT_SCHEMA]
+
+# Lecture WebHDFS : gros row groups (peu de lectures) et petits row groups
+# (une lecture par colonne et par row group, cas où le tampon compte)
+WEBHDFS_ROW_GROUPS = (128 * 1024, 2048)
+
+
+def generate_rows(count, seed=42):
+    """Résultats d'analyse produits synthétiques (format de sortie Spark)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        total_sales = rng.randint(1, 500)
+        avg_price = round(rng.uniform(5, 3000), 2)
+        total_quantity = total_sales * rng.randint(1, 4)
+        yield (f"Produit {i}, modèle {i % 97}", total_sales, total_quantity,
+               avg_price, round(avg_price * total_quantity, 2))
+
+
+def write_files(directory, count):
+    csv_path = os.path.join(directory, 'part-00000.csv')
+    parquet_path = os.path.join(directory, 'part-00000.snappy.parquet')
+
+    rows = list(generate_rows(count))
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+    pq.write_table(to_table(rows), parquet_path, compression='snappy', row_group_size=128 * 1024)
+    return csv_path, parquet_path
+
+
+def to_table(rows):
+    return pa.table({name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)})
+
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<45} {best * 1000:>10.1f} ms  ({len(result)} lignes)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Génération de {args.rows} lignes de résultats...")
+        csv_path, parquet_path = write_files(directory, args.rows)
+        print(f"Taille CSV: {os.path.getsize(csv_path) / 1e6:.1f} Mo, "
+              f"Parquet: {os.path.getsize(parquet_path) / 1e6:.1f} Mo\n")
+
+        def csv_full():
+            with open(csv_path, encoding='utf-8', newline='') as f:
+                return list(parse_rows(f, PRODUCT_SCHEMA))
+
+        def csv_filtered():
+            with open(csv_path, encoding='utf-8', newline='') as f:
+                return [{'product': r['product'], 'total_revenue': r['total_revenue']}
+                        for r in parse_rows(f, PRODUCT_SCHEMA) if r['total_revenue'] > 500000]
+
+        def parquet_full():
+            return to_records(read_table(parquet_path))
+
+        def parquet_filtered():
+            return to_records(read_table(parquet_path, columns=['product', 'total_revenue'],
+                                         filters=[('total_revenue', '>', 500000)]))
+
+        def parquet_top():
+            return to_records(read_table(parquet_path, columns=['product', 'total_revenue'],
+                                         sort_by=[('total_revenue', 'descending')], limit=10))
+
+        csv_time = timed("CSV complet (parse_rows)", csv_full, args.repeat)
+        parquet_time = timed("Parquet complet (to_records)", parquet_full, args.repeat)
+        csv_filter_time = timed("CSV filtré (revenu > 500000)", csv_filtered, args.repeat)
+        parquet_filter_time = timed("Parquet filtré (projection + pushdown)", parquet_filtered, args.repeat)
+        timed("Parquet top 10 (tri colonnaire)", parquet_top, args.repeat)
+
+        print(f"\nGain complet: x{csv_time / parquet_time:.1f}, "
+              f"gain filtré: x{csv_filter_time / parquet_filter_time:.1f}")
+
+    table = to_table(list(generate_rows(args.rows)))
+    for row_group_size in WEBHDFS_ROW_GROUPS:
+        run_webhdfs(table, row_group_size, args.repeat)
+
+
+def run_webhdfs(table, row_group_size, repeat):
+    """Lecture Parquet par WebHDFS : tampon de lecture anticipée vs une requête par lecture"""
+    print(f"\nLecture Parquet par WebHDFS (stub local, row groups de {row_group_size} lignes)")
+    data = pa.BufferOutputStream()
+    pq.write_table(table, data, compression='snappy', row_group_size=row_group_size)
+    stub = StubHDFS().start()
+    client = WebHDFSClient(stub.url)
+    stub.put(f"{PARQUET_OUTPUTS['product-analysis']}/part-00000.snappy.parquet",
+             data.getvalue().to_pybytes())
+    try:
+        for label, buffer_size in (("sans tampon", 0), (f"tampon {READ_AHEAD // 1024} Kio", READ_AHEAD)):
+            reader = ParquetAnalysisReader(client, buffer_size=buffer_size)
+            for name, options in (("complet", {}),
+                                  ("top 10", {'columns': ['product', 'total_revenue'],
+                                              'sort_by': [('total_revenue', 'descending')],
+                                              'limit': 10})):
+                stub.requests.clear()
+                timed(f"WebHDFS {name} ({label})",
+                      lambda: to_records(reader.read('product-analysis', **options)), repeat)
+                print(f"{'':<45} {stub.requests['OPEN'] / repeat:>10.0f} requêtes OPEN par lecture")
+    finally:
+        client.close()
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark : stratégies de jointure ventes-clients sur données asymétriques
+Projet Big Data - Traitement Distribué 2024-2025
+
+Usage:
+    spark-submit /scripts/benchmark/spark_join_skew.py \
+        [--sales 5000000] [--customers 200000] [--hot-share 0.3]
+
+Compare la jointure par shuffle par défaut, la jointure broadcast et la
+jointure partitionnée avec salage des clients chauds (mongodb_reader.py).
+Le salage ne peut réduire la durée que si plusieurs cœurs d'exécuteurs
+traitent les partitions en parallèle.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spark'))
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, concat, count, lit, rand, sum, when
+
+from mongodb_reader import JoinConfig, join_sales_customers
+
+
+def synthetic_data(spark, sales, customers, hot_share, cities=50):
+    """Ventes dont hot_share vont à un seul client, le reste uniformément réparti"""
+    customers_df = spark.range(customers) \
+        .select(
+            concat(lit("c"), col("id").cast("string")).alias("id"),
+            concat(lit("Ville "), (col("id") % cities).cast("string")).alias("city")
+        )
+    sales_df = spark.range(sales) \
+        .select(
+            when(rand(1) < hot_share, lit("c0"))
+            .otherwise(concat(lit("c"), (rand(2) * customers).cast("int").cast("string")))
+            .alias("customer_id"),
+            (rand(3) * 5 + 1).cast("int").alias("quantity"),
+            (rand(4) * 1000).alias("price")
+        ) \
+        .withColumn("total_amount", col("quantity") * col("price"))
+    return sales_df.cache(), customers_df.cache()
+
+
+def run(label, build_join):
+    start = time.perf_counter()
+    rows = build_join() \
+        .groupBy("city") \
+        .agg(count("*").alias("total_transactions"), sum("total_amount").alias("city_revenue")) \
+        .collect()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:>8.2f} s  ({len(rows)} villes)")
+    result = {row['city']: (row['total_transactions'], round(row['city_revenue'], 2)) for row in rows}
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des jointures ventes-clients")
+    parser.add_argument("--sales", type=int, default=5000000)
+    parser.add_argument("--customers", type=int, default=200000)
+    parser.add_argument("--hot-share", type=float, default=0.3)
+    parser.add_argument("--shuffle-partitions", type=int, default=16)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder \
+        .appName("Benchmark-Join-Skew") \
+        .config("spark.sql.shuffle.partitions", args.shuffle_partitions) \
+        .config("spark.sql.adaptive.enabled", "false") \
+        .config("spark.sql.autoBroadcastJoinThreshold", "-1") \
+        .getOrCreate()
+    spark.sparkContext.setLogLevel("WARN")
+
+    try:
+        sales_df, customers_df = synthetic_data(spark, args.sales, args.customers, args.hot_share)
+        print(f"{sales_df.count()} ventes, {customers_df.count()} clients, "
+              f"{args.hot_share:.0%} des ventes sur un seul client\n")
+
+        baseline, expected = run("Shuffle par défaut",
+                       lambda: sales_df.join(customers_df, sales_df.customer_id == customers_df.id))
+        # Le broadcast automatique est désactivé pour la référence : seuils explicites
+        broadcast_time, broadcast_result = run("Broadcast",
+                             lambda: join_sales_customers(spark, sales_df, customers_df,
+                                                          JoinConfig(broadcast_max_bytes=2 ** 40)))
+        salted_time, salted_result = run("Shuffle partitionné + salage",
+                          lambda: join_sales_customers(spark, sales_df, customers_df,
+                                                       JoinConfig(broadcast_max_bytes=-1)))
+
+        if broadcast_result != expected or salted_result != expected:
+            print("⚠️ Les résultats diffèrent de la jointure de référence")
+        print(f"\nGain broadcast: x{baseline / broadcast_time:.1f}, "
+              f"gain salage: x{baseline / salted_time:.1f}")
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+WebHDFS minimal en mémoire pour les benchmarks
+Projet Big Data - Traitement Distribué 2024-2025
+
+Répond aux opérations de lecture utilisées par l'application
+(GETFILESTATUS, LISTSTATUS, OPEN avec offset/length) à partir d'un
+dictionnaire chemin -> contenu. Suffit pour mesurer le client WebHDFS et
+le décodage des sorties Spark/Pig sans cluster Hadoop.
+"""
+
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PREFIX = '/webhdfs/v1'
+
+
+class StubHDFS:
+    """Serveur WebHDFS local (127.0.0.1, port libre) servant files"""
+
+    def __init__(self):
+        self.files = {}
+        self.modification_time = 1
+        # Nombre de requêtes reçues par opération (OPEN, LISTSTATUS...)
+        self.requests = Counter()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def put(self, path, data):
+        self.files[path] = data
+        self.modification_time += 1
+
+    def remove(self, prefix):
+        for path in [p for p in self.files if p == prefix or p.startswith(prefix.rstrip('/') + '/')]:
+            del self.files[path]
+        self.modification_time += 1
+
+    def status(self, path):
+        """FileStatus d'un fichier ou d'un répertoire implicite, None s'il n'existe pas"""
+        if path in self.files:
+            return {'type': 'FILE', 'length': len(self.files[path]),
+                    'modificationTime': self.modification_time}
+        if any(p.startswith(path + '/') for p in self.files):
+            return {'type': 'DIRECTORY', 'length': 0, 'modificationTime': self.modification_time}
+        return None
+
+    def children(self, path):
+        entries = {}
+        for file_path, data in self.files.items():
+            if file_path.startswith(path + '/'):
+                rest = file_path[len(path) + 1:]
+                name = rest.split('/', 1)[0]
+                is_dir = '/' in rest
+                entries[name] = {'pathSuffix': name, 'type': 'DIRECTORY' if is_dir else 'FILE',
+                                 'length': 0 if is_dir else len(data),
+                                 'modificationTime': self.modification_time}
+        return list(entries.values())
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # En-têtes et corps envoyés ensemble (pas d'attente Nagle/ACK retardé)
+            wbufsize = -1
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, code, body=b''):
+                self.send_response(code)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path[len(PREFIX):].rstrip('/') or '/'
+                query = parse_qs(url.query)
+                op = query.get('op', [''])[0]
+                stub.requests[op] += 1
+                if op == 'GETFILESTATUS':
+                    status = stub.status(path)
+                    if status is None:
+                        return self.reply(404)
+                    return self.reply(200, json.dumps({'FileStatus': status}).encode())
+                if op == 'LISTSTATUS':
+                    if stub.status(path) is None:
+                        return self.reply(404)
+                    body = {'FileStatuses': {'FileStatus': stub.children(path)}}
+                    return self.reply(200, json.dumps(body).encode())
+                if op == 'OPEN':
+                    if path not in stub.files:
+                        return self.reply(404)
+                    data = stub.files[path]
+                    offset = int(query.get('offset', ['0'])[0])
+                    length = query.get('length')
+                    end = offset + int(length[0]) if length else len(data)
+                    return self.reply(200, data[offset:end])
+                self.reply(400, f"Opération non supportée: {op}".encode())
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
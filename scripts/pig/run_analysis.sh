@@ -0,0 +1,36 @@
+#!/bin/bash
+# Script pour lancer l'analyse Pig sur tout l'historique ou sur une période
+# Projet Big Data - Traitement Distribué 2024-2025
+#
+# Usage : ./run_analysis.sh                          # tout l'historique
+#         ./run_analysis.sh 2024-01-01 2024-01-31    # une période
+#
+# Pour une période, seuls les répertoires de jours existants de
+# /data/sales.csv (year=/month=/day=) sont passés à Pig, et les résultats
+# sont écrits dans /pig-output/period/<début>_<fin>.
+
+set -e
+
+START_DATE=$1
+END_DATE=$2
+
+if [ -z "$START_DATE" ]; then
+    echo "[INFO] Analyse Pig sur tout l'historique..."
+    docker exec hadoop-master pig -f /scripts/pig/data_analysis.pig
+    exit $?
+fi
+
+END_DATE=${END_DATE:-$START_DATE}
+echo "[INFO] Analyse Pig du $START_DATE au $END_DATE..."
+
+# Glob des jours partitionnés de la période (listage WebHDFS depuis web-app)
+SALES_INPUT=$(docker exec web-app python partitions.py /data/sales.csv \
+    --start "$START_DATE" --end "$END_DATE")
+
+docker exec hadoop-master pig \
+    -param "SALES_INPUT=$SALES_INPUT" \
+    -param "PERIOD=true" \
+    -param "START_DATE=$START_DATE" \
+    -param "END_DATE=$END_DATE" \
+    -param "OUTPUT=/pig-output/period/${START_DATE}_${END_DATE}" \
+    -f /scripts/pig/data_analysis.pig
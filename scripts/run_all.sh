@@ -81,59 +81,15 @@ docker exec hadoop-master hdfs dfs -chmod 777 /pig-output || true
 docker exec hadoop-master hdfs dfs -chmod 777 /spark-output || true
 log_success "Répertoires HDFS créés"
 
-# 5. Créer des données CSV simples directement dans HDFS (solution alternative)
-log_info "Création des données CSV pour Pig..."
-
-# Créer sales.csv directement
-docker exec hadoop-master bash -c 'cat > /tmp/sales.csv << EOF
-id,product,quantity,price,date,customer_id
-s001,Laptop Dell XPS,1,1299.99,2024-01-15,c001
-s002,iPhone 15,2,999.99,2024-01-16,c002
-s003,Samsung Galaxy S24,1,899.99,2024-01-17,c003
-s004,MacBook Pro,1,2299.99,2024-01-18,c004
-s005,iPad Air,3,649.99,2024-01-19,c005
-s006,AirPods Pro,2,279.99,2024-01-20,c001
-s007,Laptop Dell XPS,1,1299.99,2024-01-21,c006
-s008,Samsung Galaxy S24,2,899.99,2024-01-22,c007
-s009,iPhone 15,1,999.99,2024-01-23,c008
-s010,MacBook Pro,1,2299.99,2024-01-24,c009
-s011,AirPods Pro,4,279.99,2024-01-25,c010
-s012,iPad Air,1,649.99,2024-01-26,c002
-s013,Laptop Dell XPS,2,1299.99,2024-01-27,c003
-s014,iPhone 15,1,999.99,2024-01-28,c011
-s015,Samsung Galaxy S24,3,899.99,2024-01-29,c012
-EOF'
-
-# Créer customers.csv directement
-docker exec hadoop-master bash -c 'cat > /tmp/customers.csv << EOF
-id,name,email,city,age
-c001,Alice Martin,alice.martin@email.com,Paris,28
-c002,Bob Dupont,bob.dupont@email.com,Lyon,35
-c003,Claire Moreau,claire.moreau@email.com,Marseille,42
-c004,David Bernard,david.bernard@email.com,Paris,31
-c005,Emma Leroy,emma.leroy@email.com,Toulouse,26
-c006,François Petit,francois.petit@email.com,Nice,39
-c007,Gabrielle Roux,gabrielle.roux@email.com,Lyon,33
-c008,Henri Blanc,henri.blanc@email.com,Strasbourg,45
-c009,Isabelle Girard,isabelle.girard@email.com,Paris,29
-c010,Julien Morel,julien.morel@email.com,Bordeaux,37
-c011,Karine Fournier,karine.fournier@email.com,Marseille,41
-c012,Laurent Simon,laurent.simon@email.com,Toulouse,34
-EOF'
-
-# Copier vers HDFS
-docker exec hadoop-master hdfs dfs -put -f /tmp/sales.csv /data/
-docker exec hadoop-master hdfs dfs -put -f /tmp/customers.csv /data/
-
-# Nettoyer les fichiers temporaires
-docker exec hadoop-master rm -f /tmp/sales.csv /tmp/customers.csv
-
-log_success "Données CSV créées et copiées vers HDFS"
+# 5. Transférer les données MongoDB vers HDFS (CSV pour Pig, ventes partitionnées par jour)
+log_info "Transfert des données MongoDB vers HDFS (CSV partitionné par date)..."
+docker exec web-app python transfer.py --collections sales customers --format csv
+
+log_success "Données CSV écrites dans HDFS"
 
 # Vérifier les données dans HDFS
 log_info "Vérification des données dans HDFS..."
-docker exec hadoop-master hdfs dfs -ls /data/
-docker exec hadoop-master hdfs dfs -head /data/sales.csv
+docker exec hadoop-master hdfs dfs -ls -R /data/sales.csv | head -20
 
 # 6. Exécuter l'analyse Pig
 log_info "Exécution de l'analyse Apache Pig..."
@@ -163,6 +119,9 @@ else
     log_warning "Script Spark non trouvé - ignoré"
 fi
 
+# Invalider le cache du dashboard (il surveille aussi HDFS, ceci accélère la prise en compte)
+curl -s -X POST http://localhost:5000/api/cache/invalidate > /dev/null 2>&1 || true
+
 # 8. Vérifier l'état du cluster et les résultats
 log_info "Vérification des résultats d'analyse..."
 echo ""
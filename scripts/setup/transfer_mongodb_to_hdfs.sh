@@ -1,73 +1,24 @@
 #!/bin/bash
 # Script pour transférer les données MongoDB vers HDFS
 # Projet Big Data - Traitement Distribué 2024-2025
+#
+# Le transfert est fait par app/transfer.py dans le conteneur web-app :
+# lecture parallèle par plages d'_id et écriture en flux via WebHDFS
+# (plus de mongoexport, de fichier temporaire ni de docker cp).
+#
+# Usage : ./transfer_mongodb_to_hdfs.sh [options de transfer.py]
+#   ex.  ./transfer_mongodb_to_hdfs.sh --format parquet --partitions 8
+#        ./transfer_mongodb_to_hdfs.sh --collections sales --start 2024-01-29
+#        ./transfer_mongodb_to_hdfs.sh --resume
 
 set -e
 
 echo "🔄 Transfert des données MongoDB vers HDFS..."
 
 # Variables
-MONGODB_HOST="mongodb:27017"
-HDFS_BASE="hdfs://hadoop-master:9000"
-TEMP_DIR="/tmp/mongo_export"
-
-# Créer le répertoire temporaire
-mkdir -p $TEMP_DIR
-
-# Fonction pour exporter une collection MongoDB vers HDFS
-export_collection() {
-    local collection=$1
-    local database=$2
-    
-    echo "[INFO] Export de la collection $collection..."
-    
-    # Export MongoDB vers JSON avec mongoexport depuis le conteneur MongoDB
-    docker exec mongodb mongoexport --host localhost:27017 \
-        --username admin \
-        --password password123 \
-        --authenticationDatabase admin \
-        --db $database \
-        --collection $collection \
-        --out /tmp/${collection}.json \
-        --jsonArray
-    
-    if [ $? -eq 0 ]; then
-        echo "[SUCCESS] Collection $collection exportée dans le conteneur MongoDB"
-        
-        # Copier le fichier du conteneur MongoDB vers le conteneur Hadoop
-        docker cp mongodb:/tmp/${collection}.json $TEMP_DIR/${collection}.json
-        
-        # Vérifier si le fichier existe et n'est pas vide
-        if [ -s "$TEMP_DIR/${collection}.json" ]; then
-            # Copier vers HDFS via le conteneur hadoop-master
-            docker cp $TEMP_DIR/${collection}.json hadoop-master:/tmp/${collection}.json
-            docker exec hadoop-master hdfs dfs -put -f /tmp/${collection}.json /data/
-            
-            if [ $? -eq 0 ]; then
-                echo "[SUCCESS] Collection $collection copiée vers HDFS"
-                
-                # Vérifier dans HDFS
-                docker exec hadoop-master hdfs dfs -ls /data/${collection}.json
-                
-                # Nettoyer le fichier temporaire dans hadoop-master
-                docker exec hadoop-master rm -f /tmp/${collection}.json
-            else
-                echo "[ERROR] Échec de la copie vers HDFS pour $collection"
-                return 1
-            fi
-        else
-            echo "[ERROR] Le fichier exporté $collection.json est vide ou n'existe pas"
-            return 1
-        fi
-        
-        # Nettoyer le fichier temporaire dans MongoDB
-        docker exec mongodb rm -f /tmp/${collection}.json
-        
-    else
-        echo "[ERROR] Échec de l'export pour $collection"
-        return 1
-    fi
-}
+FORMAT="csv"
+PARTITIONS=4
+PARALLELISM=4
 
 # Créer les répertoires HDFS s'ils n'existent pas
 echo "[INFO] Création des répertoires HDFS..."
@@ -75,23 +26,19 @@ docker exec hadoop-master hdfs dfs -mkdir -p /data
 docker exec hadoop-master hdfs dfs -mkdir -p /pig-output
 docker exec hadoop-master hdfs dfs -mkdir -p /spark-output
 
-# Exporter les collections existantes
-echo "[INFO] Début de l'export des collections..."
-export_collection "sales" "bigdata"
-export_collection "customers" "bigdata"
-
-# Nettoyer les fichiers temporaires
-echo "[INFO] Nettoyage des fichiers temporaires..."
-rm -rf $TEMP_DIR
+# Transférer les collections (les options passées au script sont prioritaires)
+echo "[INFO] Début du transfert des collections..."
+docker exec web-app python transfer.py \
+    --collections sales customers \
+    --format $FORMAT \
+    --partitions $PARTITIONS \
+    --parallelism $PARALLELISM \
+    "$@"
 
 echo "[SUCCESS] Transfert MongoDB vers HDFS terminé!"
 
 # Vérifier les données dans HDFS
 echo "[INFO] Contenu de HDFS /data :"
-docker exec hadoop-master hdfs dfs -ls /data/
-
-# Afficher un aperçu des données
-echo "[INFO] Aperçu des données sales dans HDFS :"
-docker exec hadoop-master hdfs dfs -head /data/sales.json
+docker exec hadoop-master hdfs dfs -ls -R /data/
 
-echo "✅ Transfert terminé avec succès!"
\ No newline at end of file
+echo "✅ Transfert terminé avec succès!"
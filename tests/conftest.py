@@ -0,0 +1,14 @@
+"""
+Configuration des tests
+Projet Big Data - Traitement Distribué 2024-2025
+
+Les modules de l'application (app/) et des benchmarks (scripts/benchmark/)
+s'importent par leur nom, comme dans leurs conteneurs.
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for directory in ('app', os.path.join('scripts', 'benchmark')):
+    sys.path.insert(0, os.path.join(ROOT, directory))
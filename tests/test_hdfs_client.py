@@ -0,0 +1,100 @@
+"""
+Tests du client WebHDFS contre le serveur stub_hdfs
+Projet Big Data - Traitement Distribué 2024-2025
+"""
+
+import asyncio
+
+import pytest
+
+from csv_parser import CUSTOMER_SCHEMA, RowParser
+from hdfs_client import AsyncWebHDFSClient, WebHDFSClient, WebHDFSError
+from stub_hdfs import StubHDFS
+
+OUTPUT = '/spark-output/customer-analysis'
+HEADER = 'customer_id,purchase_count,customer_total\n'
+
+
+@pytest.fixture
+def stub():
+    stub = StubHDFS().start()
+    stub.put(f'{OUTPUT}/part-00001.csv', (HEADER + 'c3,1,5.0\n').encode())
+    stub.put(f'{OUTPUT}/part-00000.csv', (HEADER + 'c1,2,10.5\n"c,2",3,7.25\n').encode())
+    stub.put(f'{OUTPUT}/part-00002.csv', b'')
+    stub.put(f'{OUTPUT}/_SUCCESS', b'')
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def client(stub):
+    client = WebHDFSClient(stub.url)
+    yield client
+    client.close()
+
+
+def test_file_status(client):
+    assert client.get_file_status(f'{OUTPUT}/part-00000.csv')['type'] == 'FILE'
+    assert client.get_file_status(OUTPUT)['type'] == 'DIRECTORY'
+    assert client.get_file_status('/absent') is None
+    assert not client.exists('/absent')
+
+
+def test_list_part_files_skips_markers_and_empty_parts(client):
+    names = {status['pathSuffix'] for status in client.list_status(OUTPUT)}
+    assert names == {'part-00000.csv', 'part-00001.csv', 'part-00002.csv', '_SUCCESS'}
+    assert client.list_part_files(OUTPUT) == [f'{OUTPUT}/part-00000.csv', f'{OUTPUT}/part-00001.csv']
+    assert client.list_status('/absent') is None
+    assert client.list_part_files('/absent') == []
+
+
+def test_iter_part_lines(client):
+    assert list(client.iter_part_lines(OUTPUT)) == [
+        HEADER.strip(), 'c1,2,10.5', '"c,2",3,7.25', HEADER.strip(), 'c3,1,5.0'
+    ]
+
+
+def test_read_missing_file(client):
+    with pytest.raises(WebHDFSError):
+        list(client.iter_lines('/absent'))
+    with pytest.raises(WebHDFSError):
+        client.open_file('/absent')
+
+
+@pytest.mark.parametrize('buffer_size', [0, 16])
+def test_open_file_seek_and_read(stub, client, buffer_size):
+    data = bytes(range(64))
+    stub.put('/data/blob', data)
+    with client.open_file('/data/blob', buffer_size) as source:
+        assert source.read(4) == data[:4]
+        source.seek(-8, 2)
+        assert source.read() == data[-8:]
+        source.seek(10)
+        assert source.read(3) == data[10:13]
+        assert source.tell() == 13
+    assert client.read_range('/data/blob', 60, 10) == data[60:]
+
+
+def test_open_file_reads_ahead(stub, client):
+    stub.put('/data/blob', bytes(1000))
+    with client.open_file('/data/blob', 4096) as source:
+        stub.requests.clear()
+        for _ in range(100):
+            source.read(10)
+    assert stub.requests['OPEN'] == 1
+
+
+def test_async_read_part_lines(stub):
+    async def read():
+        client = AsyncWebHDFSClient(stub.url)
+        try:
+            parser = RowParser(CUSTOMER_SCHEMA)
+            return [row async for lines in client.read_part_lines(OUTPUT)
+                    for row in parser.feed(lines)]
+        finally:
+            await client.aclose()
+
+    rows = asyncio.run(read())
+    assert [(row['customer_id'], row['customer_total']) for row in rows] == [
+        ('c1', 10.5), ('c,2', 7.25), ('c3', 5.0)
+    ]